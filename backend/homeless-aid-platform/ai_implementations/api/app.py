@@ -1,3 +1,4 @@
+import json
 import sys
 from pathlib import Path
 
@@ -50,6 +51,24 @@ def get_risk_predictor():
     return _risk_predictor
 
 
+def _parse_explain(data: dict) -> str:
+    """Read the explain option (false|top|all, booleans accepted)."""
+    explain = data.get("explain", "top")
+    if explain is True:
+        return "top"
+    if explain is False or explain is None:
+        return "false"
+    return str(explain).lower()
+
+
+def _parse_positive_int(data: dict, key: str, default: int) -> int:
+    """Read an optional positive integer option, raising ValueError otherwise."""
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{key} must be a positive integer")
+    return value
+
+
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint.""" 
@@ -84,33 +103,56 @@ def recommend_shelters():
             }
         ],
         "top_k": 5,
-        "use_bandit": true
+        "use_bandit": true,
+        "explain": "top",  // false | top | all
+        "filters": {       // Optional hard constraints applied before scoring
+            "require_capacity": true,
+            "max_distance_km": 25,
+            "eligibility": true,
+            "types": ["emergency"]
+        }
     }
+
+    Omit "shelters" to rank against the server-side shelter catalog
+    (see /api/v1/catalog/<resource_type>).
     """
     try:
         data = request.get_json()
 
         individual = data.get("individual")
-        shelters = data.get("shelters", [])
-        top_k = data.get("top_k", 5)
+        shelters = data.get("shelters")
+        top_k = _parse_positive_int(data, "top_k", 5)
         use_bandit = data.get("use_bandit", True)
+        explain = _parse_explain(data)
+        filters = data.get("filters")
 
         if not individual:
             return jsonify({"error": "Individual data is required"}), 400
 
         engine = get_recommendation_engine()
-        recommendations = engine.recommend(
-            individual, shelters, "shelter", top_k, use_bandit
+        recommendations, filter_stats = engine.recommend(
+            individual,
+            shelters,
+            "shelter",
+            top_k,
+            use_bandit,
+            explain,
+            filters=filters,
+            return_stats=True,
         )
 
         return jsonify(
             {
                 "recommendations": recommendations,
                 "individual_id": individual.get("id"),
+                "ab_variant": engine.ab_test.assign(individual.get("id")),
                 "resource_type": "shelter",
+                "filter_stats": filter_stats,
             }
         ), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -119,29 +161,45 @@ def recommend_shelters():
 def recommend_jobs():
     """
     Recommend jobs for a homeless individual.
+    Omit "jobs" to rank against the server-side job catalog.
     """
     try:
         data = request.get_json()
 
         individual = data.get("individual")
-        jobs = data.get("jobs", [])
-        top_k = data.get("top_k", 5)
+        jobs = data.get("jobs")
+        top_k = _parse_positive_int(data, "top_k", 5)
         use_bandit = data.get("use_bandit", True)
+        explain = _parse_explain(data)
+        filters = data.get("filters")
 
         if not individual:
             return jsonify({"error": "Individual data is required"}), 400
 
         engine = get_recommendation_engine()
-        recommendations = engine.recommend(individual, jobs, "job", top_k, use_bandit)
+        recommendations, filter_stats = engine.recommend(
+            individual,
+            jobs,
+            "job",
+            top_k,
+            use_bandit,
+            explain,
+            filters=filters,
+            return_stats=True,
+        )
 
         return jsonify(
             {
                 "recommendations": recommendations,
                 "individual_id": individual.get("id"),
+                "ab_variant": engine.ab_test.assign(individual.get("id")),
                 "resource_type": "job",
+                "filter_stats": filter_stats,
             }
         ), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -150,31 +208,213 @@ def recommend_jobs():
 def recommend_training():
     """
     Recommend training programs for a homeless individual.
+    Omit "programs" to rank against the server-side training catalog.
     """
     try:
         data = request.get_json()
 
         individual = data.get("individual")
-        programs = data.get("programs", [])
-        top_k = data.get("top_k", 5)
+        programs = data.get("programs")
+        top_k = _parse_positive_int(data, "top_k", 5)
         use_bandit = data.get("use_bandit", True)
+        explain = _parse_explain(data)
+        filters = data.get("filters")
 
         if not individual:
             return jsonify({"error": "Individual data is required"}), 400
 
         engine = get_recommendation_engine()
-        recommendations = engine.recommend(
-            individual, programs, "training", top_k, use_bandit
+        recommendations, filter_stats = engine.recommend(
+            individual,
+            programs,
+            "training",
+            top_k,
+            use_bandit,
+            explain,
+            filters=filters,
+            return_stats=True,
         )
 
         return jsonify(
             {
                 "recommendations": recommendations,
                 "individual_id": individual.get("id"),
+                "ab_variant": engine.ab_test.assign(individual.get("id")),
                 "resource_type": "training",
+                "filter_stats": filter_stats,
             }
         ), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/recommend/batch", methods=["POST"])
+def recommend_batch():
+    """
+    Recommend resources of one type for many individuals in one call.
+
+    Request body:
+    {
+        "resource_type": "job",  // shelter | job | training
+        "individuals": [
+            {"id": "ind_123", "skills": ["cooking"], "location": [40.71, -74.00],
+             "priority": "high"}
+        ],
+        "resources": [...],  // Optional, defaults to the server-side catalog
+        "top_k": 5,
+        "use_bandit": true,
+        "explain": "top",
+        "chunk_size": 256
+    }
+    """
+    try:
+        data = request.get_json()
+
+        resource_type = data.get("resource_type")
+        individuals = data.get("individuals")
+        resources = data.get("resources")
+        top_k = _parse_positive_int(data, "top_k", 5)
+        use_bandit = data.get("use_bandit", True)
+        explain = _parse_explain(data)
+        chunk_size = _parse_positive_int(data, "chunk_size", 256)
+
+        if not resource_type:
+            return jsonify({"error": "resource_type is required"}), 400
+        if not isinstance(individuals, list) or not individuals:
+            return jsonify({"error": "individuals must be a non-empty list"}), 400
+
+        engine = get_recommendation_engine()
+        results = engine.recommend_batch(
+            individuals,
+            resources,
+            resource_type,
+            top_k,
+            use_bandit,
+            explain,
+            chunk_size,
+        )
+
+        return jsonify({"results": results, "resource_type": resource_type}), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/placement/shelters", methods=["POST"])
+def place_shelters():
+    """
+    Assign many individuals to shelters at once without exceeding free beds.
+
+    Request body:
+    {
+        "individuals": [
+            {"id": "ind_123", "location": [40.71, -74.00], "priority": "high"}
+        ],
+        "shelters": [...],  // Optional, defaults to the server-side catalog
+        "min_score": 0.3     // Optional, leave people unassigned below this
+    }
+    """
+    try:
+        data = request.get_json()
+
+        individuals = data.get("individuals")
+        shelters = data.get("shelters")
+        min_score = data.get("min_score")
+
+        if not isinstance(individuals, list) or not individuals:
+            return jsonify({"error": "individuals must be a non-empty list"}), 400
+
+        engine = get_recommendation_engine()
+        placement = engine.place_shelters(individuals, shelters, min_score)
+
+        return jsonify(placement), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/catalog/<resource_type>", methods=["GET"])
+def get_catalog_info(resource_type):
+    """
+    Get version and size of a resource catalog (shelter, job or training).
+    """
+    try:
+        engine = get_recommendation_engine()
+        catalog = engine.get_catalog(resource_type)
+        return jsonify(catalog.info()), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/catalog/<resource_type>", methods=["PUT", "POST"])
+def update_catalog(resource_type):
+    """
+    Bulk-load (PUT, replaces everything) or upsert (POST) catalog resources.
+
+    Request body:
+    {
+        "resources": [
+            {"id": "job_1", "name": "Line Cook", "location": [40.75, -73.98],
+             "capacity": 2, "occupied": 0, "required_skills": ["cooking"]}
+        ]
+    }
+    """
+    try:
+        data = request.get_json()
+        resources = data.get("resources")
+
+        if not isinstance(resources, list):
+            return jsonify({"error": "resources must be a list"}), 400
+
+        engine = get_recommendation_engine()
+        catalog = engine.get_catalog(resource_type)
+        if request.method == "PUT":
+            catalog.load(resources)
+        else:
+            catalog.upsert(resources)
+
+        return jsonify(catalog.info()), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/catalog/<resource_type>", methods=["DELETE"])
+def delete_from_catalog(resource_type):
+    """
+    Remove resources (e.g. closed jobs) from a catalog.
+
+    Request body:
+    {
+        "ids": ["job_1", "job_2"]
+    }
+    """
+    try:
+        data = request.get_json()
+        resource_ids = data.get("ids")
+
+        if not isinstance(resource_ids, list):
+            return jsonify({"error": "ids must be a list"}), 400
+
+        engine = get_recommendation_engine()
+        catalog = engine.get_catalog(resource_type)
+        catalog.delete(resource_ids)
+
+        return jsonify(catalog.info()), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -189,7 +429,8 @@ def provide_feedback():
         "resource_type": "shelter",
         "resource_id": "shelter_1",
         "success": true,
-        "outcome_score": 0.85
+        "outcome_score": 0.85,
+        "individual_id": "ind_1"  // optional, picks the A/B variant and feeds the contextual policy
     }
     """
     try:
@@ -199,9 +440,15 @@ def provide_feedback():
         resource_id = data.get("resource_id")
         success = data.get("success")
         outcome_score = data.get("outcome_score")
+        individual_id = data.get("individual_id")
 
-        if not resource_type or not resource_id:
-            return jsonify({"error": "resource_type and resource_id are required"}), 400
+        if not (
+            resource_type and isinstance(resource_type, str)
+            and resource_id and isinstance(resource_id, str)
+        ):
+            return jsonify(
+                {"error": "resource_type and resource_id must be non-empty strings"}
+            ), 400
 
         if success is None and outcome_score is None:
             return jsonify(
@@ -209,7 +456,9 @@ def provide_feedback():
             ), 400
 
         engine = get_recommendation_engine()
-        engine.provide_feedback(resource_type, resource_id, success, outcome_score)
+        engine.provide_feedback(
+            resource_type, resource_id, success, outcome_score, individual_id
+        )
 
         return jsonify(
             {
@@ -223,6 +472,42 @@ def provide_feedback():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/v1/feedback/bulk", methods=["POST"])
+def provide_feedback_bulk():
+    """
+    Provide many feedback events at once (e.g. a backfill of case outcomes).
+
+    Request body: a JSON array of feedback objects, or newline-delimited
+    JSON (Content-Type: application/x-ndjson) with one object per line:
+    [
+        {"resource_type": "shelter", "resource_id": "shelter_1", "success": true},
+        {"resource_type": "job", "resource_id": "job_7", "outcome_score": 0.6}
+    ]
+    """
+    try:
+        if request.mimetype in ("application/x-ndjson", "application/jsonl"):
+            events = [
+                json.loads(line)
+                for line in request.get_data(as_text=True).splitlines()
+                if line.strip()
+            ]
+        else:
+            events = request.get_json()
+
+        if not isinstance(events, list) or not events:
+            return jsonify({"error": "A non-empty list of feedback events is required"}), 400
+
+        engine = get_recommendation_engine()
+        result = engine.provide_feedback_bulk(events)
+
+        return jsonify({"message": "Feedback recorded successfully", **result}), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/v1/statistics", methods=["GET"])
 def get_statistics():
     """
@@ -239,27 +524,76 @@ def get_statistics():
 @app.route("/api/v1/ab-test", methods=["POST"])
 def set_ab_variant():
     """
-    Set A/B testing variant.
+    Configure the A/B test. Individuals are bucketed by a stable hash of
+    their id; each variant has its own bandit.
 
-    Request body:
+    Request body, either:
     {
-        "variant": "A"  // or "B"
+        "split": 0.5  // share of individuals in variant B
+    }
+    or:
+    {
+        "variant": "B"  // force everyone into A or B; null resumes the split
     }
     """
     try:
         data = request.get_json()
-        variant = data.get("variant", "A")
-
-        if variant not in ["A", "B"]:
-            return jsonify({"error": "Variant must be A or B"}), 400
-
         engine = get_recommendation_engine()
-        engine.set_ab_variant(variant)
+
+        if "split" in data:
+            engine.set_ab_split(data["split"])
+            message = f"A/B split set to {engine.ab_test.split}"
+        elif "variant" in data:
+            variant = data["variant"]
+            if variant not in ["A", "B", None]:
+                return jsonify({"error": "Variant must be A, B or null"}), 400
+            engine.set_ab_variant(variant)
+            message = f"A/B variant forced to {variant}" if variant else "A/B split resumed"
+        else:
+            return jsonify({"error": "split or variant is required"}), 400
 
         return jsonify(
-            {"message": f"A/B variant set to {variant}", "variant": variant}
+            {
+                "message": message,
+                "split": engine.ab_test.split,
+                "variant": engine.ab_test.forced,
+            }
         ), 200
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/v1/bandit/policy", methods=["GET", "POST"])
+def bandit_policy():
+    """
+    Get or set the bandit policy per resource type.
+
+    Request body (POST):
+    {
+        "resource_type": "job",
+        "policy": "thompson"  // ucb, thompson, gaussian_thompson or linucb
+    }
+    """
+    try:
+        engine = get_recommendation_engine()
+
+        if request.method == "POST":
+            data = request.get_json()
+            resource_type = data.get("resource_type")
+            policy = data.get("policy")
+
+            if not resource_type or not policy:
+                return jsonify({"error": "resource_type and policy are required"}), 400
+
+            engine.set_bandit_policy(resource_type, policy)
+
+        return jsonify({"policies": engine.bandit_policies}), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -330,5 +664,44 @@ def assess_risk():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/v1/risk/assess/batch", methods=["POST"])
+def assess_risk_batch():
+    """
+    Risk assessment for many profiles at once (e.g. a caseload-wide sweep).
+    Each model runs once per batch.
+
+    Request body:
+    {
+        "profiles": [{"id": "ind_1", "age": 35, ...}, ...],
+        "nlp_analyses": [{...}, null, ...]  // Optional, one per profile
+    }
+    """
+    try:
+        data = request.get_json()
+        profiles = data.get("profiles")
+        nlp_analyses = data.get("nlp_analyses")
+
+        if not isinstance(profiles, list) or not profiles:
+            return jsonify({"error": "A non-empty list of profiles is required"}), 400
+
+        risk_predictor = get_risk_predictor()
+        assessments = risk_predictor.assess_many(profiles, nlp_analyses)
+
+        return jsonify(
+            {
+                "assessments": [
+                    {"individual_id": profile.get("id"), **assessment}
+                    for profile, assessment in zip(profiles, assessments)
+                ],
+                "count": len(assessments),
+            }
+        ), 200
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 if __name__ == "__main__":
     app.run(host=Config.API_HOST, port=Config.API_PORT, debug=Config.DEBUG)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import hashlib
+import math
+import threading
+from typing import Dict, Optional
+
+VARIANTS = ("A", "B")
+
+
+class VariantMetrics:
+    """Online counters of one variant: O(1) to update and to summarize."""
+
+    def __init__(self):
+        self.recommendations = 0
+        self.feedback = 0
+        self.reward_sum = 0.0
+        self.reward_sumsq = 0.0
+        self._lock = threading.Lock()
+
+    def record_recommendation(self):
+        with self._lock:
+            self.recommendations += 1
+
+    def record_feedback(self, reward: float, count: int = 1, reward_sumsq: float = None):
+        """Add `count` rewards summing to `reward` (pass reward_sumsq when count > 1)."""
+        with self._lock:
+            self.feedback += count
+            self.reward_sum += reward
+            self.reward_sumsq += reward * reward if reward_sumsq is None else reward_sumsq
+
+    def summary(self) -> Dict:
+        with self._lock:
+            n = self.feedback
+            mean = self.reward_sum / n if n else None
+            stderr = None
+            if n > 1:
+                variance = max(self.reward_sumsq / n - mean * mean, 0.0) * n / (n - 1)
+                stderr = math.sqrt(variance / n)
+            return {
+                "recommendations": self.recommendations,
+                "feedback": n,
+                "mean_reward": mean,
+                "stderr": stderr,
+            }
+
+
+class ABTest:
+    """
+    Deterministic A/B bucketing: an individual's variant is a stable hash
+    of their id, so assignment needs no shared state or locks and the
+    same person always sees the same variant on every worker.
+    `forced` pins all traffic to one variant (e.g. to roll one out).
+    """
+
+    def __init__(self, split: float = 0.0, salt: str = "ab", forced: Optional[str] = None):
+        self.salt = salt
+        self.split = 0.0
+        self.forced = None
+        self.configure(split=split, forced=forced)
+        self.metrics = {variant: VariantMetrics() for variant in VARIANTS}
+
+    def configure(self, split: float = None, forced: Optional[str] = None):
+        """Set the share of individuals in variant B and/or the forced variant."""
+        if split is not None:
+            split = float(split)
+            if not 0.0 <= split <= 1.0:
+                raise ValueError("split must be between 0 and 1")
+            self.split = split
+        if forced is not None and forced not in VARIANTS:
+            raise ValueError(f"Variant must be one of {', '.join(VARIANTS)}")
+        self.forced = forced
+
+    def assign(self, individual_id) -> str:
+        """
+        Variant of an individual. While a variant is forced everyone gets it,
+        with or without an id; otherwise individuals without an id get the
+        control (A).
+        """
+        if self.forced is not None:
+            return self.forced
+        if individual_id is None or self.split <= 0.0:
+            return "A"
+
+        digest = hashlib.sha1(f"{self.salt}:{individual_id}".encode("utf-8")).digest()
+        bucket = int.from_bytes(digest[:8], "big") / 2**64
+        return "B" if bucket < self.split else "A"
+
+    def summary(self) -> Dict:
+        return {
+            "split": self.split,
+            "forced": self.forced,
+            "variants": {variant: m.summary() for variant, m in self.metrics.items()},
+        }
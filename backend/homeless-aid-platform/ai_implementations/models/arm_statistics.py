@@ -0,0 +1,349 @@
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class ArmStatistics:
+    """
+    Running reward statistics for the arms (resources) of one resource
+    type: count, sum and sum of squares per arm in compact NumPy arrays,
+    indexed through an id -> row map. Memory is O(arms) no matter how
+    much feedback arrives, and every lookup is O(1).
+    Not thread-safe on its own; MultiArmedBandit guards each instance
+    with its resource type's lock.
+    """
+
+    # Per-arm arrays, grown together
+    _ARRAYS = ("counts", "sums", "sumsq")
+
+    def __init__(self, capacity: int = 64):
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.sums = np.zeros(capacity, dtype=np.float64)
+        self.sumsq = np.zeros(capacity, dtype=np.float64)
+
+        # Cached sums over all arms: counts (needed by every UCB selection)
+        # and rewards, so per-type statistics never scan the arms
+        self.total_count = 0
+        self.total_reward = 0.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, arm_id: str) -> bool:
+        return arm_id in self._rows
+
+    def row(self, arm_id: str, create: bool = False) -> int:
+        """Row of an arm, or -1 if it is unknown and create is False."""
+        row = self._rows.get(arm_id)
+        if row is not None:
+            return row
+        if not create:
+            return -1
+
+        row = len(self.ids)
+        if row >= len(self.counts):
+            self._grow(2 * len(self.counts))
+        self.ids.append(arm_id)
+        self._rows[arm_id] = row
+        return row
+
+    def rows(self, arm_ids: List[str]) -> np.ndarray:
+        """Rows for many arms (-1 for unknown ones)."""
+        get = self._rows.get
+        return np.fromiter(
+            (get(arm_id, -1) for arm_id in arm_ids), dtype=np.int64, count=len(arm_ids)
+        )
+
+    def add(self, arm_id: str, reward: float):
+        row = self.row(arm_id, create=True)
+        self.counts[row] += 1
+        self.sums[row] += reward
+        self.sumsq[row] += reward * reward
+        self.total_count += 1
+        self.total_reward += reward
+
+    def add_many(
+        self, arm_ids: List[str], rewards: np.ndarray
+    ) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Add many rewards at once, grouped by arm with bincount. Returns the
+        per-arm aggregates (ids, counts, sums, sumsq) that were applied.
+        """
+        rewards = np.asarray(rewards, dtype=np.float64)
+        row = self.row
+        rows = np.fromiter(
+            (row(arm_id, create=True) for arm_id in arm_ids),
+            dtype=np.int64,
+            count=len(arm_ids),
+        )
+
+        n = len(self.ids)
+        counts = np.bincount(rows, minlength=n)
+        sums = np.bincount(rows, weights=rewards, minlength=n)
+        sumsq = np.bincount(rows, weights=rewards * rewards, minlength=n)
+        self._apply_batch(rows, rewards, counts, sums, sumsq)
+
+        touched = np.flatnonzero(counts)
+        return (
+            [self.ids[i] for i in touched],
+            counts[touched],
+            sums[touched],
+            sumsq[touched],
+        )
+
+    def _apply_batch(
+        self,
+        rows: np.ndarray,
+        rewards: np.ndarray,
+        counts: np.ndarray,
+        sums: np.ndarray,
+        sumsq: np.ndarray,
+    ):
+        """Fold a batch (events in order, plus per-row aggregates) into the stats."""
+        n = len(counts)
+        self.counts[:n] += counts
+        self.sums[:n] += sums
+        self.sumsq[:n] += sumsq
+        self.total_count += len(rewards)
+        self.total_reward += float(sums.sum())
+
+    def count(self, arm_id: str) -> int:
+        row = self._rows.get(arm_id)
+        return 0 if row is None else int(self.counts[row])
+
+    def mean(self, arm_id: str, default: float = 0.5) -> float:
+        row = self._rows.get(arm_id)
+        if row is None or self.counts[row] == 0:
+            return default
+        return float(self.sums[row] / self.counts[row])
+
+    def variance(self, arm_id: str) -> float:
+        row = self._rows.get(arm_id)
+        if row is None or self.counts[row] == 0:
+            return 0.0
+        n = self.counts[row]
+        mean = self.sums[row] / n
+        return float(max(self.sumsq[row] / n - mean * mean, 0.0))
+
+    def gather_counts(self, arm_ids: List[str]) -> np.ndarray:
+        """Feedback counts for many arms (0 for unknown ones)."""
+        rows = self.rows(arm_ids)
+        return np.where(rows >= 0, self.counts[rows], 0)
+
+    def gather(self, arm_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(counts, sums, sumsq) for many arms as floats (zeros for unknown ones)."""
+        rows = self.rows(arm_ids)
+        known = rows >= 0
+        return tuple(
+            np.where(known, values[rows], 0.0).astype(np.float64)
+            for values in (self.counts, self.sums, self.sumsq)
+        )
+
+    def summary(self, arm_ids: List[str], default: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """(mean rewards, counts) for many arms; unknown arms get (default, 0)."""
+        rows = self.rows(arm_ids)
+        known = rows >= 0
+        counts = np.where(known, self.counts[rows], 0)
+        sums = np.where(known, self.sums[rows], 0.0)
+        means = np.divide(
+            sums, counts, out=np.full(len(arm_ids), default, dtype=np.float64), where=counts > 0
+        )
+        return means, counts
+
+    def to_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Copies of (ids, counts, sums, sumsq) trimmed to the known arms."""
+        n = len(self.ids)
+        return (
+            list(self.ids),
+            self.counts[:n].copy(),
+            self.sums[:n].copy(),
+            self.sumsq[:n].copy(),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, ids: List[str], counts: np.ndarray, sums: np.ndarray, sumsq: np.ndarray
+    ) -> "ArmStatistics":
+        """Rebuild statistics from `to_arrays` output (arrays are copied)."""
+        arms = cls(capacity=max(64, len(ids)))
+        arms.ids = list(ids)
+        arms._rows = {arm_id: row for row, arm_id in enumerate(ids)}
+        arms.counts[: len(ids)] = counts
+        arms.sums[: len(ids)] = sums
+        arms.sumsq[: len(ids)] = sumsq
+        arms.total_count = int(arms.counts.sum())
+        arms.total_reward = float(arms.sums.sum())
+        return arms
+
+    def _grow(self, capacity: int):
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+
+
+class DiscountedArmStatistics(ArmStatistics):
+    """
+    Exponentially discounted statistics for non-stationary rewards: on
+    every feedback event of the resource type all arms' counts and sums
+    are multiplied by `discount`, so an event from k events ago weighs
+    discount**k. Counts become effective (fractional) sample sizes.
+
+    The decay is lazy: the arrays hold values divided by a global `scale`
+    that shrinks by `discount` per event, so an update is O(1) instead of
+    rescaling every arm. Readers multiply by `scale`; the arrays are
+    renormalized only when it gets small enough to risk overflow.
+    """
+
+    # Renormalize once 1 / scale could lose range (~every 345k events at 0.999)
+    MIN_SCALE = 1e-150
+
+    def __init__(self, discount: float = 0.999, capacity: int = 64):
+        if not 0.0 < discount <= 1.0:
+            raise ValueError("discount must be in (0, 1]")
+        super().__init__(capacity)
+        self.discount = discount
+        self.counts = self.counts.astype(np.float64)
+        self.total_count = 0.0
+        self.scale = 1.0
+
+    def add(self, arm_id: str, reward: float):
+        row = self.row(arm_id, create=True)
+        self._decay(self.discount)
+        weight = 1.0 / self.scale
+        self.counts[row] += weight
+        self.sums[row] += reward * weight
+        self.sumsq[row] += reward * reward * weight
+        self.total_count += 1.0
+        self.total_reward += reward
+
+    def _apply_batch(self, rows, rewards, counts, sums, sumsq):
+        # Event i of m is discount**(m - 1 - i) old once the batch is in
+        m = len(rewards)
+        weights = self.discount ** np.arange(m - 1, -1, -1, dtype=np.float64)
+        n = len(counts)
+        self._decay(self.discount**m)
+        stored = weights / self.scale
+        self.counts[:n] += np.bincount(rows, weights=stored, minlength=n)
+        self.sums[:n] += np.bincount(rows, weights=stored * rewards, minlength=n)
+        self.sumsq[:n] += np.bincount(
+            rows, weights=stored * rewards * rewards, minlength=n
+        )
+        self.total_count += float(weights.sum())
+        self.total_reward += float(weights @ rewards)
+
+    def _decay(self, factor: float):
+        self.scale *= factor
+        self.total_count *= factor
+        self.total_reward *= factor
+        if self.scale < self.MIN_SCALE:
+            self._renormalize()
+
+    def _renormalize(self):
+        """Fold `scale` into the arrays (O(arms), rarely)."""
+        n = len(self.ids)
+        self.counts[:n] *= self.scale
+        self.sums[:n] *= self.scale
+        self.sumsq[:n] *= self.scale
+        self.scale = 1.0
+
+    # Means and variances are ratios, so only counts and sums need `scale`
+
+    def count(self, arm_id: str) -> int:
+        row = self._rows.get(arm_id)
+        return 0 if row is None else int(self.counts[row] * self.scale)
+
+    def gather_counts(self, arm_ids: List[str]) -> np.ndarray:
+        return super().gather_counts(arm_ids) * self.scale
+
+    def gather(self, arm_ids: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return tuple(values * self.scale for values in super().gather(arm_ids))
+
+    def summary(self, arm_ids: List[str], default: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        means, counts = super().summary(arm_ids, default)
+        return means, counts * self.scale
+
+    def to_arrays(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        ids, counts, sums, sumsq = super().to_arrays()
+        return ids, counts * self.scale, sums * self.scale, sumsq * self.scale
+
+
+class WindowedArmStatistics(ArmStatistics):
+    """
+    Statistics over each arm's last `window` rewards, kept in a fixed-size
+    ring buffer per arm. Older rewards drop out entirely, and memory is
+    O(arms * window) however much feedback arrives.
+    """
+
+    _ARRAYS = ArmStatistics._ARRAYS + ("_buffer", "_head")
+
+    def __init__(self, window: int = 100, capacity: int = 64):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        super().__init__(capacity)
+        self.window = window
+        self._buffer = np.zeros((capacity, window), dtype=np.float64)
+        self._head = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, arm_id: str, reward: float):
+        self._push(self.row(arm_id, create=True), reward)
+
+    def _apply_batch(self, rows, rewards, counts, sums, sumsq):
+        for row, reward in zip(rows, rewards):
+            self._push(row, reward)
+
+    def _push(self, row: int, reward: float):
+        if self.counts[row] < self.window:
+            self.counts[row] += 1
+            self.total_count += 1
+
+        head = self._head[row]
+        self._buffer[row, head] = reward
+        self._head[row] = (head + 1) % self.window
+
+        # Recomputed from the buffer, so no rounding drift accumulates
+        values = self._buffer[row, : self.counts[row]]
+        total = values.sum()
+        self.total_reward += total - self.sums[row]
+        self.sums[row] = total
+        self.sumsq[row] = values @ values
+
+
+class RecentActivity:
+    """
+    Feedback count and reward sum over the last `buckets * bucket_seconds`
+    seconds, in a fixed ring of time buckets. Updates and summaries cost
+    O(buckets) at most, independent of feedback volume.
+    """
+
+    def __init__(self, bucket_seconds: int = 60, buckets: int = 60):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._bucket_ids = np.full(buckets, -1, dtype=np.int64)
+        self._counts = np.zeros(buckets, dtype=np.int64)
+        self._sums = np.zeros(buckets, dtype=np.float64)
+
+    def add(self, reward_sum: float, count: int = 1, now: float = None):
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        slot = bucket % self.buckets
+        if self._bucket_ids[slot] != bucket:
+            self._bucket_ids[slot] = bucket
+            self._counts[slot] = 0
+            self._sums[slot] = 0.0
+        self._counts[slot] += count
+        self._sums[slot] += reward_sum
+
+    def summary(self, now: float = None) -> Dict:
+        bucket = int((time.time() if now is None else now) // self.bucket_seconds)
+        live = self._bucket_ids > bucket - self.buckets
+        count = int(self._counts[live].sum())
+        return {
+            "window_seconds": self.bucket_seconds * self.buckets,
+            "interactions": count,
+            "avg_reward": float(self._sums[live].sum() / count) if count else 0.0,
+        }
@@ -1,14 +1,29 @@
+import threading
+from contextlib import ExitStack, contextmanager
 import numpy as np
-import torch
 from typing import Dict, List, Tuple
-from collections import defaultdict
+from models.arm_statistics import (
+    ArmStatistics,
+    DiscountedArmStatistics,
+    RecentActivity,
+    WindowedArmStatistics,
+)
+
+POLICIES = ("ucb", "thompson", "gaussian_thompson")
+STATS_MODES = ("stationary", "discounted", "window")
 
 
 class MultiArmedBandit:
     """
     Contextual Multi-Armed Bandit for recommendation optimization.
-    Uses Upper Confidence Bound (UCB) strategy with context awareness.
-    GPU-accelerated for faster computations.
+    Uses Upper Confidence Bound (UCB) strategy with context awareness, or
+    Thompson sampling (Beta-Bernoulli or Gaussian posteriors).
+    Arm state lives in small CPU NumPy arrays; candidate sets are tiny,
+    so device transfers would cost more than the math.
+
+    Safe to share between server threads: each resource type has its own
+    lock (feedback for shelters never waits on job recommendations), and
+    epsilon/epoch have a separate small lock.
     """
 
     def __init__(
@@ -17,122 +32,353 @@ class MultiArmedBandit:
         epsilon_decay: float = 0.995,
         min_epsilon: float = 0.01,
         device: str = None,
+        store=None,
+        shared=None,
+        stats_mode: str = "stationary",
+        discount: float = 0.999,
+        window: int = 100,
+        ucb_scale: float = 1.0,
     ):
+        if stats_mode not in STATS_MODES:
+            raise ValueError(f"stats_mode must be one of {', '.join(STATS_MODES)}")
+        if stats_mode != "stationary" and (store is not None or shared is not None):
+            raise ValueError(
+                f"stats_mode '{stats_mode}' cannot be persisted or shared"
+            )
+        self.stats_mode = stats_mode
+        self.discount = discount
+        self.window = window
+
         self.epsilon = epsilon
+        self.initial_epsilon = epsilon
         self.epsilon_decay = epsilon_decay
         self.min_epsilon = min_epsilon
-        
-        # Set up device
-        self.device = torch.device(device if device else ("cuda" if torch.cuda.is_available() else "cpu"))
-        print(f"MultiArmedBandit using device: {self.device}")
+        self.ucb_scale = ucb_scale
+
+        # Kept for API compatibility; all bandit math runs on CPU
+        self.device = device
+
+        # Running reward statistics per resource type (O(arms) memory);
+        # discounted or windowed to follow shelters and jobs that change
+        self.arms: Dict[str, ArmStatistics] = {}
+
+        # Bumped on every learning update so caches can detect stale scores
+        self.epoch = 0
+
+        # Live feedback of the last hour per resource type, for dashboards
+        self.recent: Dict[str, RecentActivity] = {}
+
+        # Lock striping: one lock per resource type guards its ArmStatistics
+        self._type_locks: Dict[str, threading.Lock] = {}
+        self._type_locks_guard = threading.Lock()
+        self._epsilon_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+        # Optional BanditStore: feedback log + snapshots survive restarts
+        self.store = store
+        if store is not None:
+            store.load(self)
 
-        # Track rewards for each resource type and ID
-        self.rewards = defaultdict(lambda: defaultdict(list))
-        self.counts = defaultdict(lambda: defaultdict(int))
+        # Optional SQLiteBanditBackend: arm statistics shared across workers
+        self.shared = shared
+        if shared is not None:
+            self._sync(force=True)
 
     def select_action(
-        self, resource_type: str, candidates: List[Dict], scores: Dict[str, float]
+        self,
+        resource_type: str,
+        candidates: List[Dict],
+        scores: Dict[str, float],
+        policy: str = "ucb",
     ) -> str:
         """
-        Select best resource using epsilon-greedy with UCB.
-        GPU-accelerated UCB score calculation.
+        Select best resource using epsilon-greedy with UCB, or by Thompson
+        sampling. Either way it is one vectorized pass over the candidates.
         """
+        candidate_ids = [c["id"] for c in candidates]
+        self._sync()
+
+        if policy != "ucb":
+            return self._thompson_select(resource_type, candidate_ids, scores, policy)
+
         if np.random.random() < self.epsilon:
             # Exploration: random selection
-            return np.random.choice([c["id"] for c in candidates])
+            return candidate_ids[np.random.randint(len(candidate_ids))]
 
-        # Exploitation: select based on UCB score using GPU
-        candidate_ids = [c["id"] for c in candidates]
-        n_candidates = len(candidate_ids)
-        
-        # Prepare data for GPU processing
-        base_scores = torch.tensor(
-            [scores.get(cid, 0.0) for cid in candidate_ids],
-            device=self.device,
-            dtype=torch.float32
+        # Exploitation: select based on UCB score
+        base_scores = np.fromiter(
+            (scores.get(cid, 0.0) for cid in candidate_ids),
+            dtype=np.float64,
+            count=len(candidate_ids),
         )
-        
-        counts = torch.tensor(
-            [self.counts[resource_type][cid] for cid in candidate_ids],
-            device=self.device,
-            dtype=torch.float32
-        )
-        
-        total_counts = sum(self.counts[resource_type].values())
-        
-        # Calculate UCB bonuses on GPU
+
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            # Nothing explored yet: every candidate gets the same bonus
+            return candidate_ids[int(np.argmax(base_scores))]
+
+        with self._lock_for(resource_type):
+            counts = arms.gather_counts(candidate_ids)
+            total_count = arms.total_count
+
         # For unexplored options (count=0), set high bonus
-        ucb_bonuses = torch.where(
-            counts == 0,
-            torch.tensor(1.0, device=self.device),
-            torch.sqrt(2 * torch.log(torch.tensor(total_counts + 1, device=self.device)) / (counts + 1e-8))
+        ucb_bonuses = np.ones(len(candidate_ids))
+        explored = counts > 0
+        ucb_bonuses[explored] = self.ucb_scale * np.sqrt(
+            2 * np.log(total_count + 1) / counts[explored]
         )
-        
-        # Calculate total UCB scores
-        ucb_scores = base_scores + ucb_bonuses
-        
+
         # Find best action
-        best_idx = torch.argmax(ucb_scores).item()
-        best_id = candidate_ids[best_idx]
+        return candidate_ids[int(np.argmax(base_scores + ucb_bonuses))]
 
-        return best_id
+    def _thompson_select(
+        self,
+        resource_type: str,
+        candidate_ids: List[str],
+        scores: Dict[str, float],
+        policy: str,
+    ) -> str:
+        """
+        Draw one reward sample per candidate from its posterior and pick the
+        best base score + sample. No epsilon: the posterior width explores.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown bandit policy: {policy}")
+
+        base_scores = np.fromiter(
+            (scores.get(cid, 0.0) for cid in candidate_ids),
+            dtype=np.float64,
+            count=len(candidate_ids),
+        )
+
+        arms = self.arms.get(resource_type)
+        if arms is not None:
+            with self._lock_for(resource_type):
+                counts, sums, sumsq = arms.gather(candidate_ids)
+        else:
+            counts = sums = sumsq = np.zeros(len(candidate_ids))
+
+        if policy == "thompson":
+            # Beta(1, 1) prior; fractional rewards count as partial successes
+            successes = np.clip(sums, 0.0, counts)
+            samples = np.random.beta(1.0 + successes, 1.0 + counts - successes)
+        else:
+            # Normal posterior around the mean, prior N(0.5, 0.25) worth one event
+            means = (0.5 + sums) / (1.0 + counts)
+            variance = np.divide(
+                sumsq - sums * sums / np.maximum(counts, 1),
+                counts - 1,
+                out=np.full(len(candidate_ids), 0.25),
+                where=counts > 1,
+            )
+            stds = np.sqrt(np.maximum(variance, 1e-4) / (1.0 + counts))
+            samples = np.random.normal(means, stds)
+
+        return candidate_ids[int(np.argmax(base_scores + samples))]
 
     def update(self, resource_type: str, resource_id: str, reward: float):
         """
         Update the bandit with feedback from a placement.
+        With a store attached the event is logged before it is applied.
+        """
+        with self._lock_for(resource_type):
+            if self.store is not None:
+                self.store.append(resource_type, resource_id, reward)
+            self._apply_locked(resource_type, resource_id, reward)
+            self._get_recent(resource_type).add(reward)
+
+        if self.shared is not None:
+            self.shared.record(resource_type, resource_id, reward)
+
+        if self.store is not None:
+            self.store.maybe_snapshot(self)
+
+    def update_many(
+        self, resource_types: List[str], resource_ids: List[str], rewards: List[float]
+    ) -> Dict[str, int]:
+        """
+        Apply a batch of feedback (e.g. a backfill of case outcomes).
+        Rewards are aggregated per arm and added in one step per resource
+        type; epsilon decays once by epsilon_decay ** n. Returns the number
+        of events applied per resource type.
         """
-        self.rewards[resource_type][resource_id].append(reward)
-        self.counts[resource_type][resource_id] += 1
+        types = np.asarray(resource_types, dtype=object)
+        ids = np.asarray(resource_ids, dtype=object)
+        rewards = np.asarray(rewards, dtype=np.float64)
 
-        # Decay epsilon for less exploration over time
-        self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
+        applied = {}
+        for resource_type in dict.fromkeys(resource_types):
+            mask = types == resource_type
+            type_ids, type_rewards = ids[mask].tolist(), rewards[mask]
+
+            with self._lock_for(resource_type):
+                if self.store is not None:
+                    self.store.append_many(resource_type, type_ids, type_rewards.tolist())
+                aggregates = self._get_arms(resource_type).add_many(type_ids, type_rewards)
+                self._get_recent(resource_type).add(
+                    float(type_rewards.sum()), len(type_ids)
+                )
+
+            if self.shared is not None:
+                self.shared.record_many(resource_type, *aggregates)
+            applied[resource_type] = len(type_ids)
+
+        if applied:
+            with self._epsilon_lock:
+                self.epoch += 1
+                self.epsilon = max(
+                    self.min_epsilon, self.epsilon * self.epsilon_decay ** len(rewards)
+                )
+
+        if self.store is not None:
+            self.store.maybe_snapshot(self)
+
+        return applied
+
+    def apply_feedback(self, resource_type: str, resource_id: str, reward: float):
+        """
+        Apply one reward to in-memory state (no logging; used for replay).
+        """
+        with self._lock_for(resource_type):
+            self._apply_locked(resource_type, resource_id, reward)
+
+    def _apply_locked(self, resource_type: str, resource_id: str, reward: float):
+        """Apply one reward (caller holds the resource type's lock)."""
+        self._get_arms(resource_type).add(resource_id, reward)
+
+        with self._epsilon_lock:
+            self.epoch += 1
+            # Decay epsilon for less exploration over time
+            self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
 
     def get_average_reward(self, resource_type: str, resource_id: str) -> float:
         """
-        Get historical success rate for a resource.
-        GPU-accelerated mean calculation for large reward lists.
-        """
-        rewards_list = self.rewards[resource_type].get(resource_id, [])
-        if not rewards_list:
-            return 0.5  # Neutral default for cold start
-        
-        # Use GPU for mean calculation if list is large enough
-        if len(rewards_list) > 100:
-            rewards_tensor = torch.tensor(rewards_list, device=self.device, dtype=torch.float32)
-            return rewards_tensor.mean().item()
-        else:
-            return np.mean(rewards_list)
+        Get historical success rate for a resource (0.5 for cold start).
+        """
+        self._sync()
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            return 0.5
+        with self._lock_for(resource_type):
+            return arms.mean(resource_id, default=0.5)
+
+    def get_count(self, resource_type: str, resource_id: str) -> int:
+        """
+        Number of feedback events recorded for a resource.
+        """
+        self._sync()
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            return 0
+        with self._lock_for(resource_type):
+            return arms.count(resource_id)
+
+    def get_arm_summary(
+        self, resource_type: str, resource_ids: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (average rewards, feedback counts) for many resources at once.
+        """
+        self._sync()
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            return np.full(len(resource_ids), 0.5), np.zeros(len(resource_ids), dtype=np.int64)
+        with self._lock_for(resource_type):
+            return arms.summary(resource_ids, default=0.5)
 
     def get_stats(self) -> Dict:
         """
         Get statistics about the bandit's learning.
-        GPU-accelerated for computing aggregate statistics.
+        Totals are maintained on update, so this is O(resource types).
         """
+        self._sync()
         stats = {}
-        for resource_type in self.rewards:
-            total_interactions = sum(self.counts[resource_type].values())
-            unique_resources = len(self.counts[resource_type])
-            
-            # Calculate average reward using GPU for efficiency
-            all_rewards = []
-            for rewards in self.rewards[resource_type].values():
-                if rewards:
-                    all_rewards.extend(rewards)
-            
-            if all_rewards:
-                if len(all_rewards) > 100:
-                    # Use GPU for large datasets
-                    rewards_tensor = torch.tensor(all_rewards, device=self.device, dtype=torch.float32)
-                    avg_reward = rewards_tensor.mean().item()
-                else:
-                    avg_reward = np.mean(all_rewards)
-            else:
-                avg_reward = 0.0
-            
+        for resource_type, arms in list(self.arms.items()):
+            with self._lock_for(resource_type):
+                total_interactions = arms.total_count
+                unique_resources = len(arms)
+                total_reward = arms.total_reward
+                recent = self.recent.get(resource_type)
+                recent = recent.summary() if recent is not None else None
             stats[resource_type] = {
                 "total_interactions": total_interactions,
                 "unique_resources": unique_resources,
-                "avg_reward": avg_reward,
+                "avg_reward": total_reward / total_interactions
+                if total_interactions
+                else 0.0,
+                "recent": recent,
             }
-        
-        return stats
\ No newline at end of file
+
+        return stats
+
+    def refresh(self):
+        """
+        Pick up feedback other workers wrote to the shared store. The epoch
+        moves when anything changed, so call this before keying a cache on it.
+        """
+        self._sync()
+
+    def _sync(self, force: bool = False):
+        """
+        Adopt the shared arm statistics when another worker changed them.
+        Epsilon is derived from the global event count so every worker
+        explores at the same rate.
+        """
+        if self.shared is None:
+            return
+
+        # One thread refreshes at a time; the others keep the current view
+        if not self._sync_lock.acquire(blocking=force):
+            return
+        try:
+            loaded = self.shared.load_if_changed(force)
+            if loaded is None:
+                return
+
+            # Swapped as a whole, so readers never see a half-loaded table
+            self.arms, events = loaded
+            with self._epsilon_lock:
+                self.epsilon = max(
+                    self.min_epsilon, self.initial_epsilon * self.epsilon_decay**events
+                )
+                self.epoch += 1
+        finally:
+            self._sync_lock.release()
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold every resource type's lock, e.g. to take a consistent snapshot.
+        New resource types cannot be created meanwhile.
+        """
+        with self._type_locks_guard, ExitStack() as stack:
+            for resource_type in sorted(self._type_locks):
+                stack.enter_context(self._type_locks[resource_type])
+            yield
+
+    def _lock_for(self, resource_type: str) -> threading.Lock:
+        lock = self._type_locks.get(resource_type)
+        if lock is None:
+            with self._type_locks_guard:
+                lock = self._type_locks.setdefault(resource_type, threading.Lock())
+        return lock
+
+    def _get_arms(self, resource_type: str) -> ArmStatistics:
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            arms = self.arms.setdefault(resource_type, self._new_arms())
+        return arms
+
+    def _get_recent(self, resource_type: str) -> RecentActivity:
+        """Recent-activity counters (caller holds the resource type's lock)."""
+        recent = self.recent.get(resource_type)
+        if recent is None:
+            recent = self.recent.setdefault(resource_type, RecentActivity())
+        return recent
+
+    def _new_arms(self) -> ArmStatistics:
+        if self.stats_mode == "discounted":
+            return DiscountedArmStatistics(self.discount)
+        if self.stats_mode == "window":
+            return WindowedArmStatistics(self.window)
+        return ArmStatistics()
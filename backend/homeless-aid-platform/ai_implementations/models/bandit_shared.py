@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models.arm_statistics import ArmStatistics
+
+
+class SQLiteBanditBackend:
+    """
+    Cross-process arm statistics for MultiArmedBandit, backed by a local
+    SQLite database in WAL mode so every Gunicorn worker sees the same
+    learned rewards.
+
+    Feedback is aggregated in memory per arm and written in batches (one
+    upsert transaction per flush), so write throughput scales with the
+    number of workers. A batch is flushed as soon as it reaches
+    batch_size, and a daemon thread flushes whatever is pending every
+    flush_interval seconds, so a quiet worker never sits on feedback and
+    a killed one loses at most that interval (flush_interval <= 0 writes
+    every event immediately). Readers reload the arm table only when another
+    connection has committed since the last check (PRAGMA data_version),
+    at most once per refresh_interval seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        refresh_interval: float = 1.0,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS arm_stats (
+                resource_type TEXT NOT NULL,
+                arm_id TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                sum REAL NOT NULL DEFAULT 0,
+                sumsq REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (resource_type, arm_id)
+            );
+            CREATE TABLE IF NOT EXISTS bandit_meta (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            INSERT OR IGNORE INTO bandit_meta (key, value) VALUES ('events', 0);
+            """
+        )
+        self._conn.commit()
+
+        # Pending per-arm aggregates: [count, sum, sumsq]
+        self._pending: Dict[tuple, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        self._pending_events = 0
+        self._last_flush = time.monotonic()
+        self._last_refresh = 0.0
+        self._data_version: Optional[int] = None
+        self._dirty = True  # Force the first load
+
+        self._closed = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="bandit-shared-flush", daemon=True
+            )
+            self._flusher.start()
+
+    def record(self, resource_type: str, arm_id: str, reward: float):
+        """Queue one feedback event; flushed in batches."""
+        with self._lock:
+            self._add_pending_locked(resource_type, arm_id, 1, reward, reward * reward)
+            self._maybe_flush_locked()
+
+    def record_many(
+        self,
+        resource_type: str,
+        arm_ids: List[str],
+        counts: np.ndarray,
+        sums: np.ndarray,
+        sumsqs: np.ndarray,
+    ):
+        """Queue per-arm aggregates of many feedback events."""
+        with self._lock:
+            for arm_id, count, total, sumsq in zip(arm_ids, counts, sums, sumsqs):
+                self._add_pending_locked(
+                    resource_type, arm_id, int(count), float(total), float(sumsq)
+                )
+            self._maybe_flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def load_if_changed(self, force: bool = False):
+        """
+        Return (arms, total_events) when shared state changed since the
+        last load, otherwise None. Pending writes are flushed first so a
+        worker always sees its own feedback.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return None
+            self._last_refresh = now
+
+            if self._pending_events:
+                self._flush_locked()
+
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and not self._dirty and version == self._data_version:
+                return None
+            self._data_version = version
+            self._dirty = False
+
+            rows = self._conn.execute(
+                "SELECT resource_type, arm_id, count, sum, sumsq FROM arm_stats "
+                "ORDER BY resource_type"
+            ).fetchall()
+            events = self._conn.execute(
+                "SELECT value FROM bandit_meta WHERE key = 'events'"
+            ).fetchone()[0]
+
+        grouped: Dict[str, list] = defaultdict(list)
+        for resource_type, arm_id, count, total, sumsq in rows:
+            grouped[resource_type].append((arm_id, count, total, sumsq))
+
+        arms = {}
+        for resource_type, entries in grouped.items():
+            ids, counts, sums, sumsqs = zip(*entries)
+            arms[resource_type] = ArmStatistics.from_arrays(
+                list(ids),
+                np.array(counts, dtype=np.int64),
+                np.array(sums, dtype=np.float64),
+                np.array(sumsqs, dtype=np.float64),
+            )
+        return arms, int(events)
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                with self._lock:
+                    if self._pending_events:
+                        self._flush_locked()
+            except sqlite3.Error as e:
+                # Pending aggregates are kept and retried on the next tick
+                print(f"⚠️  Shared bandit flush failed: {e}")
+
+    def _add_pending_locked(
+        self, resource_type: str, arm_id: str, count: int, total: float, sumsq: float
+    ):
+        pending = self._pending[(resource_type, arm_id)]
+        pending[0] += count
+        pending[1] += total
+        pending[2] += sumsq
+        self._pending_events += count
+
+    def _maybe_flush_locked(self):
+        if (
+            self._pending_events >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending_events:
+            return
+
+        rows = [
+            (resource_type, arm_id, int(count), total, sumsq)
+            for (resource_type, arm_id), (count, total, sumsq) in self._pending.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO arm_stats (resource_type, arm_id, count, sum, sumsq)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (resource_type, arm_id) DO UPDATE SET
+                    count = count + excluded.count,
+                    sum = sum + excluded.sum,
+                    sumsq = sumsq + excluded.sumsq
+                """,
+                rows,
+            )
+            self._conn.execute(
+                "UPDATE bandit_meta SET value = value + ? WHERE key = 'events'",
+                (self._pending_events,),
+            )
+
+        self._pending.clear()
+        self._pending_events = 0
+        self._dirty = True
@@ -0,0 +1,275 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from models.arm_statistics import ArmStatistics
+
+
+class BanditStore:
+    """
+    Durable bandit state: an append-only feedback log plus periodic
+    binary snapshots of the arm arrays.
+
+    Layout of the state directory:
+        feedback.log                    one JSON event per line
+        snapshots/<seq>/meta.json       epsilon, epoch, log offset, arm ids
+        snapshots/<seq>/<n>.<field>.npy arrays of the n-th resource type
+        CURRENT                         name of the latest complete snapshot
+
+    At startup the latest snapshot's arrays are read into memory and only
+    the log tail written after it is replayed. Replaying the whole log with
+    `replay(until=...)` reconstructs the state at any point in time.
+    A torn final line (a crash mid-write) is cut off before appending.
+    Snapshots are written one at a time and CURRENT only moves forward.
+    """
+
+    LOG_NAME = "feedback.log"
+    FIELDS = ("counts", "sums", "sumsq")
+
+    def __init__(self, directory: str, snapshot_every: int = 1000, keep_snapshots: int = 2):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots
+
+        os.makedirs(os.path.join(directory, "snapshots"), exist_ok=True)
+        self.log_path = os.path.join(directory, self.LOG_NAME)
+
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._truncate_torn_tail()
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        self.seq = 0
+        self._since_snapshot = 0
+
+    def append(self, resource_type: str, resource_id: str, reward: float) -> int:
+        """Log one feedback event. Returns its sequence number."""
+        with self._lock:
+            self.seq += 1
+            event = {
+                "seq": self.seq,
+                "ts": time.time(),
+                "type": resource_type,
+                "id": resource_id,
+                "reward": reward,
+            }
+            self._log.write(json.dumps(event) + "\n")
+            self._log.flush()
+            self._since_snapshot += 1
+            return self.seq
+
+    def append_many(
+        self, resource_type: str, resource_ids: List[str], rewards: List[float]
+    ) -> int:
+        """Log many events with one write. Returns the last sequence number."""
+        with self._lock:
+            now = time.time()
+            lines = []
+            for resource_id, reward in zip(resource_ids, rewards):
+                self.seq += 1
+                event = {
+                    "seq": self.seq,
+                    "ts": now,
+                    "type": resource_type,
+                    "id": resource_id,
+                    "reward": float(reward),
+                }
+                lines.append(json.dumps(event) + "\n")
+            self._log.write("".join(lines))
+            self._log.flush()
+            self._since_snapshot += len(lines)
+            return self.seq
+
+    def should_snapshot(self) -> bool:
+        return self.snapshot_every > 0 and self._since_snapshot >= self.snapshot_every
+
+    def maybe_snapshot(self, bandit):
+        """
+        Snapshot once snapshot_every events have been logged since the last
+        one. Callers arriving while a snapshot is being written skip it, and
+        a failed snapshot is only reported: the logged events are durable.
+        """
+        if not self.should_snapshot() or not self._snapshot_lock.acquire(blocking=False):
+            return
+        try:
+            if self.should_snapshot():
+                self._save_snapshot_locked(bandit)
+        except OSError as e:
+            print(f"⚠️  Bandit snapshot failed: {e}")
+        finally:
+            self._snapshot_lock.release()
+
+    def save_snapshot(self, bandit):
+        """Write a snapshot of the bandit's arm arrays and exploration state."""
+        with self._snapshot_lock:
+            self._save_snapshot_locked(bandit)
+
+    def _save_snapshot_locked(self, bandit):
+        # Copy state while no feedback is in flight, so the log offset and
+        # the arrays describe exactly the same events
+        with bandit.locked():
+            with self._lock:
+                self._log.flush()
+                seq = self.seq
+                log_offset = self._log.tell()
+                self._since_snapshot = 0
+
+            arrays = {
+                resource_type: arms.to_arrays() for resource_type, arms in bandit.arms.items()
+            }
+            epsilon, epoch = bandit.epsilon, bandit.epoch
+
+        # Nothing logged since the snapshot CURRENT points to
+        if seq <= self._current_seq():
+            return
+
+        name = f"{seq:012d}"
+        final_dir = os.path.join(self.directory, "snapshots", name)
+        tmp_dir = f"{final_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        types = {}
+        for n, (resource_type, (ids, counts, sums, sumsq)) in enumerate(arrays.items()):
+            types[resource_type] = {"file": n, "ids": ids}
+            for field, values in zip(self.FIELDS, (counts, sums, sumsq)):
+                np.save(os.path.join(tmp_dir, f"{n}.{field}.npy"), values)
+
+        meta = {
+            "seq": seq,
+            "log_offset": log_offset,
+            "epsilon": epsilon,
+            "epoch": epoch,
+            "created_at": time.time(),
+            "types": types,
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+        self._write_current(name)
+        self._prune_snapshots()
+
+    def load(self, bandit):
+        """
+        Restore the bandit from the latest snapshot plus the log tail.
+        Replayed events are applied without being logged again.
+        """
+        meta, snapshot_dir = self._read_current()
+        log_offset = 0
+
+        if meta is not None:
+            arms = {}
+            for resource_type, info in meta["types"].items():
+                arrays = [
+                    np.load(os.path.join(snapshot_dir, f"{info['file']}.{field}.npy"))
+                    for field in self.FIELDS
+                ]
+                arms[resource_type] = ArmStatistics.from_arrays(info["ids"], *arrays)
+
+            bandit.arms = arms
+            bandit.epsilon = meta["epsilon"]
+            bandit.epoch = meta["epoch"]
+            log_offset = meta["log_offset"]
+            self.seq = meta["seq"]
+
+        replayed = 0
+        for event in self._read_log(log_offset):
+            bandit.apply_feedback(event["type"], event["id"], event["reward"])
+            self.seq = event["seq"]
+            replayed += 1
+
+        self._since_snapshot = replayed
+        if meta is not None or replayed:
+            print(
+                f"✅ Restored bandit state (snapshot seq {meta['seq'] if meta else 0}, "
+                f"{replayed} logged events replayed)"
+            )
+
+    def replay(self, bandit, until: Optional[float] = None):
+        """
+        Rebuild state from the full log into a fresh bandit, stopping at
+        events newer than the `until` timestamp.
+        """
+        for event in self._read_log(0):
+            if until is not None and event["ts"] > until:
+                break
+            bandit.apply_feedback(event["type"], event["id"], event["reward"])
+
+    def close(self):
+        with self._lock:
+            self._log.close()
+
+    def _truncate_torn_tail(self):
+        """Cut the log back to its last complete line, so appends start clean."""
+        if not os.path.exists(self.log_path):
+            return
+
+        with open(self.log_path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+
+            if position < end:
+                print(f"⚠️  Dropping {end - position} bytes of a torn bandit log write")
+                f.truncate(position)
+
+    def _read_log(self, offset: int) -> Iterator[Dict]:
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # Torn final write
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print(f"⚠️  Skipping unreadable bandit log line: {line[:80]!r}")
+
+    def _current_seq(self) -> int:
+        current = os.path.join(self.directory, "CURRENT")
+        try:
+            with open(current) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return -1
+
+    def _write_current(self, name: str):
+        """Point CURRENT at a snapshot, unless it already names a newer one."""
+        if int(name) <= self._current_seq():
+            return
+        current = os.path.join(self.directory, "CURRENT")
+        tmp = f"{current}.tmp-{os.getpid()}-{threading.get_ident()}"
+        with open(tmp, "w") as f:
+            f.write(name)
+        os.replace(tmp, current)
+
+    def _read_current(self):
+        current = os.path.join(self.directory, "CURRENT")
+        if not os.path.exists(current):
+            return None, None
+
+        with open(current) as f:
+            snapshot_dir = os.path.join(self.directory, "snapshots", f.read().strip())
+        try:
+            with open(os.path.join(snapshot_dir, "meta.json")) as f:
+                return json.load(f), snapshot_dir
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable bandit snapshot: {e}")
+            return None, None
+
+    def _prune_snapshots(self):
+        root = os.path.join(self.directory, "snapshots")
+        names = sorted(n for n in os.listdir(root) if n.isdigit())
+        for name in names[: -self.keep_snapshots]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
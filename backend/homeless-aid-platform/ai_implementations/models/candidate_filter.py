@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Tuple
+
+import math
+
+import numpy as np
+
+from models.geo import LatitudeIndex
+
+PRIORITY_LEVELS = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+
+
+class CandidateFilter:
+    """
+    Hard-constraint pre-filter that removes candidates before scoring.
+    Stages run cheapest first and each reports how many candidates it
+    removed:
+    - capacity: resources with a capacity but no free places
+    - type: resources whose "type" is not in the allowed types
+    - eligibility: resources whose priority_support excludes the
+      individual's priority, or whose "eligibility" rules (gender,
+      min_age, max_age) the individual does not meet
+    - radius: resources farther than max_distance_km (latitude-band index)
+    Resources missing the field a stage checks are kept, and so are
+    resources or individuals whose value is malformed (null, wrong type):
+    the rule simply does not apply to them.
+    Options are validated on construction (ValueError on bad values); a
+    single type string is accepted in place of a list.
+    """
+
+    OPTIONS = ("require_capacity", "types", "eligibility", "max_distance_km")
+
+    def __init__(
+        self,
+        require_capacity: bool = False,
+        types: Optional[List[str]] = None,
+        eligibility: bool = False,
+        max_distance_km: Optional[float] = None,
+    ):
+        self.require_capacity = self._flag("require_capacity", require_capacity)
+        self.types = self._types(types)
+        self.eligibility = self._flag("eligibility", eligibility)
+        self.max_distance_km = self._distance(max_distance_km)
+
+    @staticmethod
+    def _flag(name: str, value) -> bool:
+        if value is None:
+            return False
+        if not isinstance(value, bool):
+            raise ValueError(f"{name} must be true or false")
+        return value
+
+    @staticmethod
+    def _types(types) -> Optional[set]:
+        if not types:
+            return None
+        if isinstance(types, str):
+            return {types}
+        if not isinstance(types, (list, tuple, set)) or not all(
+            isinstance(t, str) for t in types
+        ):
+            raise ValueError("types must be a string or a list of strings")
+        return set(types)
+
+    @staticmethod
+    def _distance(max_distance_km) -> Optional[float]:
+        if max_distance_km is None:
+            return None
+        if isinstance(max_distance_km, bool):
+            raise ValueError("max_distance_km must be a number")
+        try:
+            distance = float(max_distance_km)
+        except (TypeError, ValueError):
+            raise ValueError("max_distance_km must be a number")
+        if math.isnan(distance) or distance < 0:
+            raise ValueError("max_distance_km must be a non-negative number")
+        return distance
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self.require_capacity
+            or self.types
+            or self.eligibility
+            or self.max_distance_km is not None
+        )
+
+    def with_options(self, options: Optional[Dict]) -> "CandidateFilter":
+        """Copy of this filter with per-request overrides applied."""
+        if not options:
+            return self
+        if not isinstance(options, dict):
+            raise ValueError("filters must be an object")
+
+        unknown = set(options) - set(self.OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown filter options: {', '.join(sorted(unknown))}")
+
+        settings = {
+            "require_capacity": self.require_capacity,
+            "types": list(self.types) if self.types else None,
+            "eligibility": self.eligibility,
+            "max_distance_km": self.max_distance_km,
+        }
+        settings.update(options)
+        return CandidateFilter(**settings)
+
+    def apply(
+        self,
+        individual: Dict,
+        resources: List[Dict],
+        spatial_index: LatitudeIndex = None,
+    ) -> Tuple[np.ndarray, Dict]:
+        """
+        Returns the indices of resources that pass every stage and the
+        per-stage removal counts.
+        """
+        keep = np.ones(len(resources), dtype=bool)
+        removed = {}
+
+        if self.require_capacity:
+            removed["capacity"] = self._stage(keep, resources, self._has_capacity)
+
+        if self.types:
+            removed["type"] = self._stage(keep, resources, self._type_allowed)
+
+        if self.eligibility:
+            removed["eligibility"] = self._stage(
+                keep, resources, lambda r: self._is_eligible(individual, r)
+            )
+
+        location = self._location(individual.get("location"))
+        if self.max_distance_km is not None and location:
+            if spatial_index is None or spatial_index.size != len(resources):
+                spatial_index = LatitudeIndex(resources)
+
+            in_radius = np.zeros(len(resources), dtype=bool)
+            in_radius[spatial_index.within(location[0], location[1], self.max_distance_km)] = True
+            in_radius[spatial_index.missing] = True
+
+            removed["radius"] = int(np.count_nonzero(keep & ~in_radius))
+            keep &= in_radius
+
+        kept = np.flatnonzero(keep)
+        stats = {"input": len(resources), "removed": removed, "remaining": len(kept)}
+        return kept, stats
+
+    @staticmethod
+    def _stage(keep: np.ndarray, resources: List[Dict], predicate) -> int:
+        """Evaluate predicate on still-kept resources; returns how many it dropped."""
+        dropped = 0
+        for idx in np.flatnonzero(keep):
+            if not predicate(resources[idx]):
+                keep[idx] = False
+                dropped += 1
+        return dropped
+
+    @staticmethod
+    def _number(value) -> Optional[float]:
+        """A finite number from a request value, or None if it is not one."""
+        if value is None or isinstance(value, bool):
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return number if math.isfinite(number) else None
+
+    @classmethod
+    def _location(cls, location) -> Optional[Tuple[float, float]]:
+        if not isinstance(location, (list, tuple)) or len(location) < 2:
+            return None
+        lat, lon = cls._number(location[0]), cls._number(location[1])
+        return None if lat is None or lon is None else (lat, lon)
+
+    @staticmethod
+    def _strings(values) -> set:
+        """Lower-cased strings of a list (or single string) value."""
+        if isinstance(values, str):
+            values = [values]
+        if not isinstance(values, (list, tuple, set)):
+            return set()
+        return {v.lower() for v in values if isinstance(v, str)}
+
+    @classmethod
+    def _has_capacity(cls, resource: Dict) -> bool:
+        capacity = cls._number(resource.get("capacity"))
+        if capacity is None:
+            return True
+        return capacity - (cls._number(resource.get("occupied")) or 0.0) > 0
+
+    def _type_allowed(self, resource: Dict) -> bool:
+        resource_type = resource.get("type")
+        return not isinstance(resource_type, str) or resource_type in self.types
+
+    @classmethod
+    def _is_eligible(cls, individual: Dict, resource: Dict) -> bool:
+        support = cls._strings(resource.get("priority_support"))
+        if support:
+            level = PRIORITY_LEVELS.get(str(individual.get("priority", "medium")).lower(), 2)
+            if level not in {PRIORITY_LEVELS.get(p, 2) for p in support}:
+                return False
+
+        rules = resource.get("eligibility")
+        if not isinstance(rules, dict):
+            return True
+
+        genders = cls._strings(rules.get("gender"))
+        gender = individual.get("gender")
+        if genders and isinstance(gender, str) and gender.lower() not in genders:
+            return False
+
+        age = cls._number(individual.get("age"))
+        if age is not None:
+            min_age = cls._number(rules.get("min_age"))
+            max_age = cls._number(rules.get("max_age"))
+            if min_age is not None and age < min_age:
+                return False
+            if max_age is not None and age > max_age:
+                return False
+
+        return True
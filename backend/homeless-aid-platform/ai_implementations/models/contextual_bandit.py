@@ -0,0 +1,217 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.risk_predictor_helpers import job_features
+
+# Scorer components that describe the (individual, resource) pair.
+# historical_score is left out: it is the non-contextual bandit's estimate.
+CONTEXT_COMPONENTS = (
+    "location_score",
+    "skill_match_score",
+    "availability_score",
+    "priority_score",
+)
+
+# Bias term + job features + pair components
+CONTEXT_DIM = 1 + 8 + len(CONTEXT_COMPONENTS)
+
+
+def build_contexts(
+    individual: Dict, components: Dict[str, np.ndarray], indices: np.ndarray
+) -> np.ndarray:
+    """
+    (len(indices), CONTEXT_DIM) context vectors for an individual and the
+    candidates at `indices` of a `score_candidates` result.
+    """
+    n = len(indices)
+    profile = np.asarray(job_features(individual), dtype=np.float64)
+    pair = np.column_stack(
+        [np.asarray(components[name], dtype=np.float64)[indices]
+         for name in CONTEXT_COMPONENTS]
+    )
+    return np.hstack([np.ones((n, 1)), np.broadcast_to(profile, (n, len(profile))), pair])
+
+
+class _LinearArms:
+    """
+    Ridge-regression state of the arms of one resource type: A^-1, b and
+    theta = A^-1 b per arm, stacked in arrays indexed through an id -> row map.
+    """
+
+    def __init__(self, dim: int, ridge: float, capacity: int = 64):
+        self.dim = dim
+        self.ridge = ridge
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+
+        self.a_inv = np.tile(np.eye(dim) / ridge, (capacity, 1, 1))
+        self.b = np.zeros((capacity, dim))
+        self.theta = np.zeros((capacity, dim))
+        self.counts = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, arm_id: str) -> int:
+        row = self._rows.get(arm_id)
+        if row is None:
+            row = len(self.ids)
+            if row >= len(self.counts):
+                self._grow(2 * len(self.counts))
+            self.ids.append(arm_id)
+            self._rows[arm_id] = row
+        return row
+
+    def gather(self, arm_ids: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(A^-1, theta) for many arms; unknown arms get the prior."""
+        get = self._rows.get
+        rows = np.fromiter(
+            (get(arm_id, -1) for arm_id in arm_ids), dtype=np.int64, count=len(arm_ids)
+        )
+        known = rows >= 0
+        prior = np.eye(self.dim) / self.ridge
+        a_inv = np.where(known[:, None, None], self.a_inv[rows], prior)
+        theta = np.where(known[:, None], self.theta[rows], 0.0)
+        return a_inv, theta
+
+    def update(self, arm_id: str, x: np.ndarray, reward: float):
+        """Rank-one Sherman-Morrison update of A^-1, O(d^2)."""
+        row = self.row(arm_id)
+        a_inv = self.a_inv[row]
+        a_inv_x = a_inv @ x
+        a_inv -= np.outer(a_inv_x, a_inv_x) / (1.0 + x @ a_inv_x)
+        self.b[row] += reward * x
+        self.theta[row] = a_inv @ self.b[row]
+        self.counts[row] += 1
+
+    def _grow(self, capacity: int):
+        old = len(self.counts)
+        a_inv = np.tile(np.eye(self.dim) / self.ridge, (capacity, 1, 1))
+        a_inv[:old] = self.a_inv
+        self.a_inv = a_inv
+        for name in ("b", "theta", "counts"):
+            values = getattr(self, name)
+            grown = np.zeros((capacity,) + values.shape[1:], dtype=values.dtype)
+            grown[:old] = values
+            setattr(self, name, grown)
+
+
+class LinUCBPolicy:
+    """
+    Contextual bandit (disjoint LinUCB): each arm keeps a ridge regression
+    of reward on the context vector of the individual and the candidate, so
+    outcomes generalize across similar individuals. Scoring a candidate set
+    is one batched einsum; feedback is an O(d^2) Sherman-Morrison update.
+
+    The context a recommendation was made with is remembered (bounded) under
+    (resource type, individual id, resource id) until feedback arrives.
+    """
+
+    def __init__(
+        self,
+        dim: int = CONTEXT_DIM,
+        alpha: float = 1.0,
+        ridge: float = 1.0,
+        max_pending: int = 10000,
+    ):
+        self.dim = dim
+        self.alpha = alpha
+        self.ridge = ridge
+        self.max_pending = max_pending
+
+        self.arms: Dict[str, _LinearArms] = {}
+        self.epoch = 0
+
+        self._type_locks: Dict[str, threading.Lock] = {}
+        self._type_locks_guard = threading.Lock()
+        self._pending: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._pending_lock = threading.Lock()
+
+    def ucb_scores(
+        self, resource_type: str, candidate_ids: List[str], contexts: np.ndarray
+    ) -> np.ndarray:
+        """theta . x + alpha * sqrt(x' A^-1 x) for every candidate."""
+        arms = self.arms.get(resource_type)
+        if arms is None:
+            # Prior only: theta = 0, A^-1 = I / ridge
+            width = np.einsum("ij,ij->i", contexts, contexts) / self.ridge
+            return self.alpha * np.sqrt(width)
+
+        with self._lock_for(resource_type):
+            a_inv, theta = arms.gather(candidate_ids)
+
+        expected = np.einsum("ij,ij->i", theta, contexts)
+        width = np.einsum("ij,ijk,ik->i", contexts, a_inv, contexts)
+        return expected + self.alpha * np.sqrt(np.maximum(width, 0.0))
+
+    def select_action(
+        self,
+        resource_type: str,
+        candidate_ids: List[str],
+        contexts: np.ndarray,
+        base_scores: np.ndarray,
+    ) -> str:
+        """Pick the candidate with the best base score + LinUCB score."""
+        ucb = self.ucb_scores(resource_type, candidate_ids, contexts)
+        return candidate_ids[int(np.argmax(base_scores + ucb))]
+
+    def update(
+        self, resource_type: str, resource_id: str, context: np.ndarray, reward: float
+    ):
+        """Learn from the reward of a recommendation made with `context`."""
+        x = np.asarray(context, dtype=np.float64)
+        if x.shape != (self.dim,):
+            raise ValueError(f"Context must have {self.dim} features")
+
+        with self._lock_for(resource_type):
+            arms = self.arms.get(resource_type)
+            if arms is None:
+                arms = self.arms.setdefault(resource_type, _LinearArms(self.dim, self.ridge))
+            arms.update(resource_id, x, reward)
+            self.epoch += 1
+
+    def remember(
+        self,
+        resource_type: str,
+        individual_id: str,
+        resource_ids: List[str],
+        contexts: np.ndarray,
+    ):
+        """Keep the contexts of recommended resources until feedback arrives."""
+        with self._pending_lock:
+            for resource_id, context in zip(resource_ids, contexts):
+                key = (resource_type, individual_id, resource_id)
+                self._pending[key] = context
+                self._pending.move_to_end(key)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+
+    def pop_context(
+        self, resource_type: str, individual_id: str, resource_id: str
+    ) -> Optional[np.ndarray]:
+        with self._pending_lock:
+            return self._pending.pop((resource_type, individual_id, resource_id), None)
+
+    def get_stats(self) -> Dict:
+        arms_stats = {}
+        for resource_type, arms in list(self.arms.items()):
+            with self._lock_for(resource_type):
+                arms_stats[resource_type] = {
+                    "total_interactions": int(arms.counts.sum()),
+                    "unique_resources": len(arms),
+                }
+        return {
+            "alpha": self.alpha,
+            "pending_contexts": len(self._pending),
+            "arms": arms_stats,
+        }
+
+    def _lock_for(self, resource_type: str) -> threading.Lock:
+        lock = self._type_locks.get(resource_type)
+        if lock is None:
+            with self._type_locks_guard:
+                lock = self._type_locks.setdefault(resource_type, threading.Lock())
+        return lock
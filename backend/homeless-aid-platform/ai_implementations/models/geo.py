@@ -0,0 +1,95 @@
+"""Vectorized geodesic helpers shared by the scorer and route optimizer."""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+DECAY_CURVES = ("linear", "exponential", "gaussian", "inverse")
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Great-circle distance in km. Arguments are degrees and broadcast
+    against each other, so one origin vs N points (or an M x N grid)
+    is a single call.
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2)
+    )
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distance_decay(distance_km, curve: str = "linear", scale_km: float = 50.0) -> np.ndarray:
+    """
+    Map distances to a proximity score in [0, 1] (1 = same place).
+
+    - linear: falls to 0 at scale_km
+    - exponential: exp(-d / scale_km)
+    - gaussian: exp(-(d / scale_km)^2 / 2)
+    - inverse: 1 / (1 + d / scale_km)
+    """
+    ratio = np.asarray(distance_km, dtype=np.float64) / scale_km
+
+    if curve == "linear":
+        return np.clip(1.0 - ratio, 0.0, 1.0)
+    if curve == "exponential":
+        return np.exp(-ratio)
+    if curve == "gaussian":
+        return np.exp(-0.5 * ratio**2)
+    if curve == "inverse":
+        return 1.0 / (1.0 + ratio)
+    raise ValueError(f"Unknown distance decay curve: {curve}")
+
+
+def location_arrays(items: List[Dict], key: str = "location"):
+    """
+    Extract (lat, lon, has_location) arrays from dicts holding a
+    [lat, lon] pair under `key`.
+    """
+    n = len(items)
+    lats = np.zeros(n, dtype=np.float64)
+    lons = np.zeros(n, dtype=np.float64)
+    valid = np.zeros(n, dtype=bool)
+
+    for i, item in enumerate(items):
+        location: Sequence = item.get(key)
+        if location:
+            lats[i], lons[i] = location[0], location[1]
+            valid[i] = True
+
+    return lats, lons, valid
+
+
+class LatitudeIndex:
+    """
+    Points sorted by latitude. Radius queries binary-search the latitude
+    band that can contain matches and run the exact haversine check only
+    on that band.
+    """
+
+    def __init__(self, items: List[Dict], key: str = "location"):
+        lats, lons, valid = location_arrays(items, key)
+
+        located = np.flatnonzero(valid)
+        order = np.argsort(lats[located], kind="stable")
+
+        self.size = len(items)
+        self.missing = np.flatnonzero(~valid)  # Items without a location
+        self.indices = located[order]
+        self.lats = lats[self.indices]
+        self.lons = lons[self.indices]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices (into the original items) within radius_km of (lat, lon)."""
+        band = np.degrees(radius_km / EARTH_RADIUS_KM)
+        lo = np.searchsorted(self.lats, lat - band, side="left")
+        hi = np.searchsorted(self.lats, lat + band, side="right")
+
+        distances = haversine_km(lat, lon, self.lats[lo:hi], self.lons[lo:hi])
+        return self.indices[lo:hi][distances <= radius_km]
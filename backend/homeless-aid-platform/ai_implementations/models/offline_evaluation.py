@@ -0,0 +1,246 @@
+"""
+Offline evaluation of bandit settings against logged recommendations.
+
+Each logged event is one JSON object per line:
+{
+    "resource_type": "shelter",
+    "candidates": [{"id": "shelter_1", "score": 0.82}, ...],
+    "chosen": "shelter_1",
+    "reward": 1.0,
+    "propensity": 0.25   // optional, P(logging policy chose it); uniform if missing
+}
+
+Every configuration is replayed through MultiArmedBandit.select_action,
+the same rerank step RecommendationEngine uses, and scored with the
+replay, inverse-propensity (IPS), direct-method (DM) and doubly-robust
+(DR) estimators. Configurations run in parallel, one process per core.
+
+"score" is the composite score at logging time. It is UCB's exploitation
+term, so under UCB learned rewards show up only through the bonus;
+Thompson policies sample the learned posteriors directly.
+
+    python -m models.offline_evaluation events.jsonl \
+        --policy ucb thompson --epsilon 0.05 0.1 0.2 --workers 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from models.bandit import POLICIES, STATS_MODES, MultiArmedBandit
+
+# Bandit settings a configuration may override, with their defaults
+DEFAULT_CONFIG = {
+    "policy": "ucb",
+    "epsilon": 0.1,
+    "epsilon_decay": 0.995,
+    "min_epsilon": 0.01,
+    "ucb_scale": 1.0,
+    "stats_mode": "stationary",
+    "discount": 0.999,
+    "window": 100,
+    "seed": 0,
+}
+
+# Events of the current worker process (set once by the pool initializer)
+_events: List[Dict] = []
+_reward_model: Dict = {}
+
+
+def load_events(path: str) -> List[Dict]:
+    """Read and validate logged events from a JSON-lines file."""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            candidate_ids = [c["id"] for c in event.get("candidates", [])]
+            if event.get("chosen") not in candidate_ids:
+                raise ValueError(f"Line {line_no}: chosen must be a candidate")
+            if "reward" not in event or "resource_type" not in event:
+                raise ValueError(f"Line {line_no}: resource_type and reward are required")
+            events.append(event)
+    return events
+
+
+def fit_reward_model(events: List[Dict]) -> Dict:
+    """
+    Direct-method reward model: mean logged reward per (resource type,
+    resource), falling back to the resource type's mean.
+    """
+    sums = defaultdict(float)
+    counts = defaultdict(int)
+    for event in events:
+        resource_type = event["resource_type"]
+        for key in ((resource_type, event["chosen"]), (resource_type, None)):
+            sums[key] += event["reward"]
+            counts[key] += 1
+    return {key: sums[key] / counts[key] for key in counts}
+
+
+def _predict(reward_model: Dict, resource_type: str, resource_id: str) -> float:
+    reward = reward_model.get((resource_type, resource_id))
+    if reward is None:
+        reward = reward_model.get((resource_type, None), 0.5)
+    return reward
+
+
+def evaluate(config: Dict, events: List[Dict], reward_model: Dict) -> Dict:
+    """
+    Replay the events through a bandit built from `config`.
+    The bandit only learns from events where it agrees with the logged
+    choice, since those are the only rewards it would have observed.
+    """
+    config = {**DEFAULT_CONFIG, **config}
+    np.random.seed(config["seed"])
+    bandit = MultiArmedBandit(
+        epsilon=config["epsilon"],
+        epsilon_decay=config["epsilon_decay"],
+        min_epsilon=config["min_epsilon"],
+        stats_mode=config["stats_mode"],
+        discount=config["discount"],
+        window=config["window"],
+        ucb_scale=config["ucb_scale"],
+    )
+
+    started = time.perf_counter()
+    matched = 0
+    replay_total = ips_total = dm_total = dr_total = 0.0
+
+    for event in events:
+        resource_type = event["resource_type"]
+        candidates = event["candidates"]
+        chosen, reward = event["chosen"], event["reward"]
+        propensity = event.get("propensity") or 1.0 / len(candidates)
+
+        picked = bandit.select_action(
+            resource_type,
+            candidates,
+            {c["id"]: c.get("score", 0.0) for c in candidates},
+            policy=config["policy"],
+        )
+
+        predicted = _predict(reward_model, resource_type, picked)
+        dm_total += predicted
+        dr_total += predicted
+
+        if picked == chosen:
+            matched += 1
+            replay_total += reward
+            ips_total += reward / propensity
+            residual = reward - _predict(reward_model, resource_type, chosen)
+            dr_total += residual / propensity
+            bandit.update(resource_type, chosen, reward)
+
+    n = max(len(events), 1)
+    return {
+        "config": config,
+        "events": len(events),
+        "matched": matched,
+        "replay": replay_total / matched if matched else None,
+        "ips": ips_total / n,
+        "dm": dm_total / n,
+        "dr": dr_total / n,
+        "runtime_s": round(time.perf_counter() - started, 4),
+    }
+
+
+def _init_worker(path: str):
+    global _events, _reward_model
+    _events = load_events(path)
+    _reward_model = fit_reward_model(_events)
+
+
+def _evaluate_in_worker(config: Dict) -> Dict:
+    return evaluate(config, _events, _reward_model)
+
+
+def config_grid(**options: List) -> List[Dict]:
+    """Cartesian product of option lists, e.g. config_grid(epsilon=[0.05, 0.1])."""
+    names = list(options)
+    return [dict(zip(names, values)) for values in itertools.product(*options.values())]
+
+
+def run_grid(path: str, configs: List[Dict], workers: int = None) -> List[Dict]:
+    """Evaluate every configuration in parallel; results in input order."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(path)
+        return [_evaluate_in_worker(config) for config in configs]
+
+    chunksize = max(1, len(configs) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(path,)
+    ) as pool:
+        return list(pool.map(_evaluate_in_worker, configs, chunksize=chunksize))
+
+
+def _parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("events", help="JSON-lines file of logged events")
+    parser.add_argument("--policy", nargs="+", choices=POLICIES, default=["ucb"])
+    parser.add_argument("--epsilon", nargs="+", type=float, default=[0.1])
+    parser.add_argument("--epsilon-decay", nargs="+", type=float, default=[0.995])
+    parser.add_argument("--min-epsilon", nargs="+", type=float, default=[0.01])
+    parser.add_argument("--ucb-scale", nargs="+", type=float, default=[1.0])
+    parser.add_argument(
+        "--stats-mode", nargs="+", choices=STATS_MODES, default=["stationary"]
+    )
+    parser.add_argument("--discount", nargs="+", type=float, default=[0.999])
+    parser.add_argument("--window", nargs="+", type=int, default=[100])
+    parser.add_argument("--seed", nargs="+", type=int, default=[0])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort-by", choices=("dr", "ips", "dm", "replay"), default="dr")
+    parser.add_argument("--output", help="Write all results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def _sort_key(result: Dict, metric: str) -> Tuple[bool, float]:
+    value = result[metric]
+    return (value is not None, value if value is not None else 0.0)
+
+
+def main(argv: List[str] = None):
+    args = _parse_args(argv)
+    configs = config_grid(
+        policy=args.policy,
+        epsilon=args.epsilon,
+        epsilon_decay=args.epsilon_decay,
+        min_epsilon=args.min_epsilon,
+        ucb_scale=args.ucb_scale,
+        stats_mode=args.stats_mode,
+        discount=args.discount,
+        window=args.window,
+        seed=args.seed,
+    )
+
+    started = time.perf_counter()
+    results = run_grid(args.events, configs, args.workers)
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda r: _sort_key(r, args.sort_by), reverse=True)
+
+    print(f"Evaluated {len(results)} configurations in {elapsed:.1f}s")
+    for result in results[:20]:
+        config = {k: v for k, v in result["config"].items() if DEFAULT_CONFIG[k] != v}
+        replay = "n/a" if result["replay"] is None else f"{result['replay']:.4f}"
+        print(
+            f"dr={result['dr']:.4f} ips={result['ips']:.4f} dm={result['dm']:.4f} "
+            f"replay={replay} matched={result['matched']} "
+            f"time={result['runtime_s']:.2f}s {config or 'defaults'}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Capacity-constrained assignment of individuals to resources."""
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# Cost of a forbidden (below min_score) pairing; never chosen over a real one
+_FORBIDDEN_COST = 1e6
+
+
+def assign_with_capacities(
+    scores: np.ndarray, capacities: np.ndarray, min_score: float = None
+) -> np.ndarray:
+    """
+    Maximize the total score of assigning rows (individuals) to columns
+    (resources) such that column j receives at most capacities[j] rows.
+
+    Each resource is expanded into one assignment slot per free bed (never
+    more than the number of individuals), which turns the problem into a
+    rectangular min-cost assignment solved exactly by linear_sum_assignment.
+
+    Returns the assigned column per row, or -1 for rows left unassigned
+    (no free capacity, or every option scored below min_score).
+    """
+    n_rows = scores.shape[0]
+    assignment = np.full(n_rows, -1, dtype=np.int64)
+
+    slots_per_column = np.clip(np.asarray(capacities, dtype=np.int64), 0, n_rows)
+    slot_columns = np.repeat(np.arange(len(slots_per_column)), slots_per_column)
+    if n_rows == 0 or len(slot_columns) == 0:
+        return assignment
+
+    slot_scores = scores[:, slot_columns]
+    cost = -slot_scores
+    if min_score is not None:
+        cost = np.where(slot_scores >= min_score, cost, _FORBIDDEN_COST)
+
+    rows, slots = linear_sum_assignment(cost)
+
+    allowed = cost[rows, slots] < _FORBIDDEN_COST
+    assignment[rows[allowed]] = slot_columns[slots[allowed]]
+    return assignment
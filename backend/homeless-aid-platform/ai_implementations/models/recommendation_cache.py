@@ -0,0 +1,73 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class RecommendationCache:
+    """
+    LRU cache of scored recommendation results with a TTL.
+    Keys include the catalog version and bandit epoch, so entries go stale
+    automatically when resources or learned rewards change; invalidate()
+    additionally frees them eagerly.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def stable_hash(value: Any) -> str:
+        """Stable hash of a JSON-like value (e.g. an individual's profile)."""
+        payload = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource_type: str = None):
+        """
+        Drop cached results, for one resource type (the second key field)
+        or all of them.
+        """
+        with self._lock:
+            if resource_type is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == resource_type]:
+                del self._entries[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,9 +1,26 @@
+import atexit
+import threading
+import numpy as np
 import torch
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+import os
+from models.ab_testing import ABTest
 from models.bandit import MultiArmedBandit
+from models.bandit_shared import SQLiteBanditBackend
+from models.bandit_store import BanditStore
+from models.candidate_filter import CandidateFilter
+from models.contextual_bandit import LinUCBPolicy, build_contexts
+from models.geo import LatitudeIndex
+from models.placement import assign_with_capacities
+from models.recommendation_cache import RecommendationCache
+from models.resource_catalog import ResourceCatalog
 from models.scorer import RecommendationScorer
 from config import Config
 
+RESOURCE_TYPES = ("shelter", "job", "training")
+EXPLAIN_MODES = ("false", "top", "all")
+BANDIT_POLICIES = ("ucb", "thompson", "gaussian_thompson", "linucb")
+
 
 class RecommendationEngine:
     """
@@ -15,106 +32,624 @@ class RecommendationEngine:
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"RecommendationEngine using device: {self.device}")
         
+        # One isolated bandit per A/B variant; B explores more
+        self.bandits: Dict[str, MultiArmedBandit] = {
+            "A": self._build_bandit("A", Config.EPSILON),
+            "B": self._build_bandit(
+                "B",
+                getattr(Config, "AB_VARIANT_B_EPSILON", min(0.2, Config.EPSILON * 1.5)),
+            ),
+        }
+        self.bandit = self.bandits["A"]  # Control
+        self.ab_test = ABTest(
+            split=getattr(Config, "AB_TEST_SPLIT", 0.0),
+            salt=getattr(Config, "AB_TEST_SALT", "ab"),
+        )
+
         # Initialize components with device for GPU acceleration
-        self.bandit = MultiArmedBandit(
-            epsilon=Config.EPSILON,
+        self.scorer = RecommendationScorer(
+            bandit=self.bandit,
+            device=self.device,
+            skill_cache_path=getattr(Config, "SKILL_EMBEDDING_CACHE_PATH", None),
+        )
+
+        # Bandit policy per resource type (a name, or a {type: name} dict)
+        policies = getattr(Config, "BANDIT_POLICY", "ucb")
+        if isinstance(policies, str):
+            policies = dict.fromkeys(RESOURCE_TYPES, policies)
+        self.bandit_policies: Dict[str, str] = {
+            resource_type: policies.get(resource_type, "ucb")
+            for resource_type in RESOURCE_TYPES
+        }
+        for policy in self.bandit_policies.values():
+            if policy not in BANDIT_POLICIES:
+                raise ValueError(
+                    f"BANDIT_POLICY must be one of {', '.join(BANDIT_POLICIES)}"
+                )
+
+        # Contextual policy: learns from individual + candidate features,
+        # one per A/B variant like the bandits
+        self.contextual_bandits: Dict[str, LinUCBPolicy] = {
+            variant: LinUCBPolicy(
+                alpha=getattr(Config, "LINUCB_ALPHA", 1.0),
+                ridge=getattr(Config, "LINUCB_RIDGE", 1.0),
+            )
+            for variant in self.bandits
+        }
+        self.contextual_bandit = self.contextual_bandits["A"]  # Control
+
+        # Server-side resource catalogs, one per resource type
+        self.catalogs: Dict[str, ResourceCatalog] = {}
+        self._catalog_lock = threading.Lock()
+
+        # Hard-constraint pre-filter, overridable per request
+        self.candidate_filter = CandidateFilter(
+            **getattr(Config, "CANDIDATE_FILTERS", {})
+        )
+        self._spatial_indexes: Dict[str, Tuple[int, LatitudeIndex]] = {}
+
+        # Scored results for catalog-backed requests
+        self.recommendation_cache = RecommendationCache(
+            max_entries=getattr(Config, "RECOMMENDATION_CACHE_SIZE", 1024),
+            ttl_seconds=getattr(Config, "RECOMMENDATION_CACHE_TTL", 300),
+        )
+
+    def _build_bandit(self, variant: str, epsilon: float) -> MultiArmedBandit:
+        """
+        Bandit of one A/B variant, with its own shared or durable state when
+        configured (the control keeps the configured paths as they are).
+        """
+        bandit_shared = None
+        bandit_store = None
+        shared_db = getattr(Config, "BANDIT_SHARED_DB", None)
+        state_dir = getattr(Config, "BANDIT_STATE_DIR", None)
+        if shared_db:
+            path = shared_db if variant == "A" else f"{shared_db}.variant_{variant}"
+            bandit_shared = SQLiteBanditBackend(path)
+            if state_dir and variant == "A":
+                print("⚠️  BANDIT_SHARED_DB is set, ignoring BANDIT_STATE_DIR")
+        elif state_dir:
+            directory = state_dir
+            if variant != "A":
+                directory = os.path.join(state_dir, f"variant_{variant}")
+            bandit_store = BanditStore(
+                directory,
+                snapshot_every=getattr(Config, "BANDIT_SNAPSHOT_EVERY", 1000),
+            )
+
+        bandit = MultiArmedBandit(
+            epsilon=epsilon,
             epsilon_decay=Config.EPSILON_DECAY,
             min_epsilon=Config.MIN_EPSILON,
             device=str(self.device),
+            store=bandit_store,
+            shared=bandit_shared,
+            stats_mode=getattr(Config, "BANDIT_STATS_MODE", "stationary"),
+            discount=getattr(Config, "BANDIT_DISCOUNT", 0.999),
+            window=getattr(Config, "BANDIT_WINDOW", 100),
         )
-        self.scorer = RecommendationScorer(bandit=self.bandit, device=self.device)
-        self.ab_test_variant = "A"  # Default variant
+        if bandit_store is not None:
+            atexit.register(bandit_store.save_snapshot, bandit)
+        if bandit_shared is not None:
+            atexit.register(bandit_shared.close)
+        return bandit
 
     def recommend(
         self,
         individual: Dict,
-        resources: List[Dict],
+        resources: Optional[List[Dict]],
         resource_type: str,
         top_k: int = 5,
         use_bandit: bool = True,
-    ) -> List[Dict]:
+        explain: str = "top",
+        filters: Dict = None,
+        return_stats: bool = False,
+    ):
         """
         Generate top-k recommendations for an individual.
+        Pass resources=None to rank against the server-side catalog.
+
+        explain controls score breakdowns: "false" skips them, "top" adds
+        them to the returned top-k, "all" also appends every other candidate
+        in score order, each with its breakdown. It never changes the top-k.
+
+        filters overrides the engine's pre-filter options for this call
+        (see CandidateFilter). With return_stats=True the result is
+        (recommendations, filter_stats).
+
+        The individual's A/B variant (a stable hash of their id) picks the
+        bandit that reranks and learns for them.
+
+        Catalog-backed results are cached per (profile, resource type,
+        catalog version, variant, bandit epoch, options) until the TTL expires.
         """
-        if not resources:
-            return []
+        if explain not in EXPLAIN_MODES:
+            raise ValueError(f"explain must be one of {', '.join(EXPLAIN_MODES)}")
 
-        # Calculate scores for all candidates using GPU batch processing
-        scored_resources = []
-        scores_dict = {}
+        variant = self.ab_test.assign(individual.get("id"))
+        bandit = self.bandits[variant]
+        contextual = self.contextual_bandits[variant]
+        self.ab_test.metrics[variant].record_recommendation()
 
-        # Batch process scores on GPU for efficiency
-        scores_tensor = torch.zeros(len(resources), device=self.device)
-        
-        for idx, resource in enumerate(resources):
-            score, explanation = self.scorer.calculate_composite_score(
-                individual, resource, resource_type
-            )
-            scores_tensor[idx] = score
-            scores_dict[resource["id"]] = score
+        candidate_filter = self.candidate_filter.with_options(filters)
+
+        sync_index = True
+        spatial_index = None
+        cache_key = None
+        if resources is None:
+            # Catalog resources are already in the skill index
+            catalog = self.get_catalog(resource_type)
+            version, resources = catalog.snapshot()
+            sync_index = False
 
-            scored_resources.append(
-                {"resource": resource, "score": score, "explanation": explanation}
+            # Adopt other workers' feedback first so the epoch is current
+            bandit.refresh()
+            cache_key = (
+                RecommendationCache.stable_hash(individual),
+                resource_type,
+                version,
+                variant,
+                bandit.epoch,
+                contextual.epoch,
+                top_k,
+                use_bandit,
+                explain,
+                RecommendationCache.stable_hash(filters) if filters else None,
             )
+            cached = self.recommendation_cache.get(cache_key)
+            if cached is not None:
+                return cached if return_stats else cached[0]
 
-        # Use GPU-accelerated sorting
-        sorted_indices = torch.argsort(scores_tensor, descending=True).cpu().numpy()
-        scored_resources = [scored_resources[i] for i in sorted_indices]
+            if candidate_filter.max_distance_km is not None:
+                spatial_index = self._get_spatial_index(resource_type, version, resources)
 
-        # If using bandit, reorder top candidates
-        if use_bandit and len(scored_resources) > 0:
-            # Get top candidates for bandit selection
-            top_candidates = scored_resources[: min(top_k * 2, len(scored_resources))]
+        # Drop candidates that violate hard constraints before scoring
+        filter_stats = None
+        if candidate_filter.enabled and resources:
+            kept, filter_stats = candidate_filter.apply(
+                individual, resources, spatial_index
+            )
+            if len(kept) < len(resources):
+                resources = [resources[i] for i in kept]
 
-            # Let bandit select the best one
-            best_id = self.bandit.select_action(
+        results = []
+        if resources:
+            # Score every candidate in vectorized passes
+            composite, components = self.scorer.score_candidates(
+                individual, resources, resource_type, sync=sync_index, bandit=bandit
+            )
+            results = self._select(
+                resources,
                 resource_type,
-                [item["resource"] for item in top_candidates],
-                scores_dict,
+                composite,
+                components,
+                top_k,
+                use_bandit,
+                explain,
+                individual=individual,
+                bandit=bandit,
+                contextual=contextual,
             )
 
-            # Move selected to front
-            for i, item in enumerate(top_candidates):
-                if item["resource"]["id"] == best_id:
-                    if i > 0:
-                        top_candidates.insert(0, top_candidates.pop(i))
-                    break
+        if cache_key is not None:
+            self.recommendation_cache.put(cache_key, (results, filter_stats))
 
-            # Combine with remaining
-            scored_resources = top_candidates + scored_resources[len(top_candidates) :]
+        if return_stats:
+            return results, filter_stats
+        return results
 
-        # Return top-k with explanations
-        results = []
-        for item in scored_resources[:top_k]:
-            results.append(
+    def recommend_batch(
+        self,
+        individuals: List[Dict],
+        resources: Optional[List[Dict]],
+        resource_type: str,
+        top_k: int = 5,
+        use_bandit: bool = True,
+        explain: str = "top",
+        chunk_size: int = 256,
+    ) -> List[Dict]:
+        """
+        Generate top-k recommendations for many individuals at once.
+        Individuals are scored against all resources as a matrix, chunk_size
+        individuals at a time to bound memory, grouped by A/B variant so each
+        group uses its own bandit.
+        """
+        if explain not in EXPLAIN_MODES:
+            raise ValueError(f"explain must be one of {', '.join(EXPLAIN_MODES)}")
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(f"Unknown resource type: {resource_type}")
+
+        sync_index = True
+        if resources is None:
+            _, resources = self.get_catalog(resource_type).snapshot()
+            sync_index = False
+
+        if not resources:
+            return [
+                {"individual_id": ind.get("id"), "recommendations": []}
+                for ind in individuals
+            ]
+
+        # Posted resources get one scratch skill index shared by all chunks
+        skill_index = None
+        if sync_index:
+            skill_index = self.scorer.build_skill_index(resources)
+
+        by_variant: Dict[str, List[int]] = {}
+        for position, individual in enumerate(individuals):
+            variant = self.ab_test.assign(individual.get("id"))
+            by_variant.setdefault(variant, []).append(position)
+
+        results: List[Optional[Dict]] = [None] * len(individuals)
+        chunk_size = max(1, chunk_size)
+        for variant, positions in by_variant.items():
+            bandit = self.bandits[variant]
+            contextual = self.contextual_bandits[variant]
+            metrics = self.ab_test.metrics[variant]
+
+            for start in range(0, len(positions), chunk_size):
+                chunk_positions = positions[start : start + chunk_size]
+                chunk = [individuals[position] for position in chunk_positions]
+                composite, components = self.scorer.score_matrix(
+                    chunk,
+                    resources,
+                    resource_type,
+                    sync=sync_index,
+                    bandit=bandit,
+                    skill_index=skill_index,
+                )
+
+                for row, position in enumerate(chunk_positions):
+                    recommendations = self._select(
+                        resources,
+                        resource_type,
+                        composite[row],
+                        self.scorer.component_row(components, row),
+                        top_k,
+                        use_bandit,
+                        explain,
+                        individual=individuals[position],
+                        bandit=bandit,
+                        contextual=contextual,
+                    )
+                    metrics.record_recommendation()
+                    results[position] = {
+                        "individual_id": individuals[position].get("id"),
+                        "recommendations": recommendations,
+                    }
+
+        return results
+
+    def place_shelters(
+        self,
+        individuals: List[Dict],
+        shelters: Optional[List[Dict]] = None,
+        min_score: float = None,
+    ) -> Dict:
+        """
+        Jointly place many individuals into shelters without overbooking.
+        Maximizes the total composite score subject to each shelter's free
+        beds (capacity - occupied). Pass shelters=None to use the catalog.
+        Each individual is scored with their A/B variant's bandit.
+        """
+        sync_index = True
+        if shelters is None:
+            _, shelters = self.get_catalog("shelter").snapshot()
+            sync_index = False
+
+        if not individuals or not shelters:
+            return {
+                "assignments": [],
+                "unassigned": [ind.get("id") for ind in individuals],
+                "total_score": 0.0,
+                "beds_remaining": {s["id"]: self._free_beds(s) for s in shelters},
+            }
+
+        by_variant: Dict[str, List[int]] = {}
+        for row, individual in enumerate(individuals):
+            variant = self.ab_test.assign(individual.get("id"))
+            by_variant.setdefault(variant, []).append(row)
+
+        composite = np.empty((len(individuals), len(shelters)))
+        for variant, rows in by_variant.items():
+            composite[rows], _ = self.scorer.score_matrix(
+                [individuals[row] for row in rows],
+                shelters,
+                "shelter",
+                sync=sync_index,
+                bandit=self.bandits[variant],
+            )
+        free_beds = np.array([self._free_beds(s) for s in shelters])
+        assignment = assign_with_capacities(composite, free_beds, min_score)
+
+        assignments = []
+        unassigned = []
+        for row, col in enumerate(assignment):
+            individual_id = individuals[row].get("id")
+            if col < 0:
+                unassigned.append(individual_id)
+                continue
+            assignments.append(
                 {
-                    "resource_id": item["resource"]["id"],
-                    "resource_name": item["resource"].get("name", "Unknown"),
-                    "resource_type": resource_type,
-                    "score": item["score"],
-                    "explanation": item["explanation"],
-                    "resource_details": item["resource"],
+                    "individual_id": individual_id,
+                    "resource_id": shelters[col]["id"],
+                    "resource_name": shelters[col].get("name", "Unknown"),
+                    "score": float(composite[row, col]),
                 }
             )
 
+        placed = np.bincount(assignment[assignment >= 0], minlength=len(shelters))
+        return {
+            "assignments": assignments,
+            "unassigned": unassigned,
+            "total_score": float(sum(a["score"] for a in assignments)),
+            "beds_remaining": {
+                shelter["id"]: int(free_beds[col] - placed[col])
+                for col, shelter in enumerate(shelters)
+            },
+        }
+
+    @staticmethod
+    def _free_beds(shelter: Dict) -> int:
+        return max(0, int(shelter.get("capacity", 0)) - int(shelter.get("occupied", 0)))
+
+    def _select(
+        self,
+        resources: List[Dict],
+        resource_type: str,
+        composite: np.ndarray,
+        components: Dict[str, np.ndarray],
+        top_k: int,
+        use_bandit: bool,
+        explain: str,
+        individual: Dict = None,
+        bandit: MultiArmedBandit = None,
+        contextual: LinUCBPolicy = None,
+    ) -> List[Dict]:
+        """
+        Turn one individual's candidate scores into ranked recommendations.
+        With the LinUCB policy the individual's features drive the rerank.
+        """
+        if bandit is None:
+            bandit = self.bandit
+        if contextual is None:
+            contextual = self.contextual_bandit
+
+        # Partial selection: only the candidates we may return (or let the
+        # bandit choose between) are ever sorted
+        n_candidates = min(top_k * 2 if use_bandit else top_k, len(resources))
+        top_indices = self._top_indices(composite, n_candidates)
+
+        # If using bandit, move its pick among the top candidates to the front
+        contexts = None
+        if use_bandit and len(top_indices) > 0:
+            policy = self.bandit_policies.get(resource_type, "ucb")
+            if policy == "linucb" and individual is not None:
+                contexts = build_contexts(individual, components, top_indices)
+                best_id = contextual.select_action(
+                    resource_type,
+                    [resources[i]["id"] for i in top_indices],
+                    contexts,
+                    composite[top_indices],
+                )
+            else:
+                best_id = bandit.select_action(
+                    resource_type,
+                    [resources[i] for i in top_indices],
+                    {resources[i]["id"]: float(composite[i]) for i in top_indices},
+                    policy="ucb" if policy == "linucb" else policy,
+                )
+            for pos, idx in enumerate(top_indices):
+                if resources[idx]["id"] == best_id:
+                    if pos > 0:
+                        order = np.r_[pos, 0:pos, pos + 1 : len(top_indices)]
+                        top_indices = top_indices[order]
+                        if contexts is not None:
+                            contexts = contexts[order]
+                    break
+
+        # Keep the contexts of what we return, so feedback can be learned from
+        if contexts is not None and individual.get("id") is not None:
+            contextual.remember(
+                resource_type,
+                individual["id"],
+                [resources[i]["id"] for i in top_indices[:top_k]],
+                contexts[:top_k],
+            )
+
+        # explain="all" lists every other candidate after the top-k, by score
+        returned = top_indices[:top_k]
+        if explain == "all":
+            rest = np.ones(len(resources), dtype=bool)
+            rest[returned] = False
+            rest = np.flatnonzero(rest)
+            rest = rest[np.argsort(-composite[rest], kind="stable")]
+            returned = np.concatenate([returned, rest])
+
+        # Return top-k, with explanations only when requested
+        results = []
+        for idx in returned:
+            resource = resources[idx]
+            item = {
+                "resource_id": resource["id"],
+                "resource_name": resource.get("name", "Unknown"),
+                "resource_type": resource_type,
+                "score": float(composite[idx]),
+                "resource_details": resource,
+            }
+            if explain != "false":
+                item["explanation"] = self.scorer.build_explanation(
+                    composite, components, idx
+                )
+            results.append(item)
+
         return results
 
+    @staticmethod
+    def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Indices of the k highest scores, best first, using argpartition so
+        only those k are sorted.
+        """
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    def _get_spatial_index(
+        self, resource_type: str, version: int, resources: List[Dict]
+    ) -> LatitudeIndex:
+        """
+        Latitude index over a catalog snapshot, rebuilt when the catalog changes.
+        """
+        cached = self._spatial_indexes.get(resource_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        index = LatitudeIndex(resources)
+        self._spatial_indexes[resource_type] = (version, index)
+        return index
+
+    def get_catalog(self, resource_type: str) -> ResourceCatalog:
+        """
+        Get (or create) the resource catalog for a resource type.
+        """
+        catalog = self.catalogs.get(resource_type)
+        if catalog is not None:
+            return catalog
+
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(f"Unknown resource type: {resource_type}")
+
+        with self._catalog_lock:
+            catalog = self.catalogs.get(resource_type)
+            if catalog is None:
+                catalog = ResourceCatalog(resource_type)
+                catalog.add_listener(
+                    lambda resources: self.scorer.index_resources(resource_type, resources),
+                    lambda resource_ids: self.remove_resources(resource_type, resource_ids),
+                )
+                catalog.add_listener(
+                    lambda _: self.recommendation_cache.invalidate(resource_type),
+                    lambda _: self.recommendation_cache.invalidate(resource_type),
+                )
+                self.catalogs[resource_type] = catalog
+        return catalog
+
+    def remove_resources(self, resource_type: str, resource_ids: List[str]):
+        """
+        Drop closed or deleted resources from the scoring indexes.
+        """
+        for resource_id in resource_ids:
+            self.scorer.remove_resource(resource_type, resource_id)
+
     def provide_feedback(
         self,
         resource_type: str,
         resource_id: str,
         success: bool,
         outcome_score: float = None,
+        individual_id: str = None,
     ):
         """
         Update the model with feedback from a placement.
+        individual_id routes the feedback to the individual's A/B variant
+        (without it: the forced variant if one is set, else the control, the
+        same bandit that served id-less recommendations), and lets the
+        contextual policy learn from the context the recommendation was
+        made with.
         """
         if outcome_score is not None:
             reward = outcome_score
         else:
             reward = 1.0 if success else 0.0
 
-        self.bandit.update(resource_type, resource_id, reward)
+        variant = self.ab_test.assign(individual_id)
+        self.bandits[variant].update(resource_type, resource_id, reward)
+        self.ab_test.metrics[variant].record_feedback(reward)
+        self._contextual_feedback(
+            variant, resource_type, resource_id, individual_id, reward
+        )
+
+    def _contextual_feedback(
+        self,
+        variant: str,
+        resource_type: str,
+        resource_id: str,
+        individual_id: str,
+        reward: float,
+    ):
+        if individual_id is None:
+            return
+        contextual = self.contextual_bandits[variant]
+        context = contextual.pop_context(resource_type, individual_id, resource_id)
+        if context is not None:
+            contextual.update(resource_type, resource_id, context, reward)
+
+    def provide_feedback_bulk(self, events: List[Dict]) -> Dict:
+        """
+        Apply many feedback events ({"resource_type", "resource_id",
+        "success" and/or "outcome_score", optionally "individual_id") as one
+        aggregated bandit update.
+        """
+        resource_types, resource_ids, rewards, variants = [], [], [], []
+        for n, event in enumerate(events):
+            if not isinstance(event, dict):
+                raise ValueError(f"Event {n} must be an object")
+
+            resource_type = event.get("resource_type")
+            resource_id = event.get("resource_id")
+            success = event.get("success")
+            outcome_score = event.get("outcome_score")
+
+            if not (
+                resource_type and isinstance(resource_type, str)
+                and resource_id and isinstance(resource_id, str)
+            ):
+                raise ValueError(
+                    f"Event {n}: resource_type and resource_id must be non-empty strings"
+                )
+            if success is None and outcome_score is None:
+                raise ValueError(f"Event {n}: either success or outcome_score is required")
+
+            resource_types.append(resource_type)
+            resource_ids.append(resource_id)
+            variants.append(self.ab_test.assign(event.get("individual_id")))
+            if outcome_score is not None:
+                rewards.append(float(outcome_score))
+            else:
+                rewards.append(1.0 if success else 0.0)
+
+        # One aggregated update per variant's bandit
+        applied: Dict[str, int] = {}
+        variants = np.asarray(variants)
+        rewards_array = np.asarray(rewards, dtype=np.float64)
+        for variant in np.unique(variants):
+            rows = np.flatnonzero(variants == variant)
+            variant_rewards = rewards_array[rows]
+            by_type = self.bandits[variant].update_many(
+                [resource_types[i] for i in rows],
+                [resource_ids[i] for i in rows],
+                variant_rewards,
+            )
+            self.ab_test.metrics[variant].record_feedback(
+                float(variant_rewards.sum()),
+                count=len(rows),
+                reward_sumsq=float(variant_rewards @ variant_rewards),
+            )
+            for resource_type, count in by_type.items():
+                applied[resource_type] = applied.get(resource_type, 0) + count
+
+        for event, variant, resource_type, resource_id, reward in zip(
+            events, variants, resource_types, resource_ids, rewards
+        ):
+            self._contextual_feedback(
+                variant, resource_type, resource_id, event.get("individual_id"), reward
+            )
+        return {"applied": len(rewards), "by_resource_type": applied}
 
     def get_statistics(self) -> Dict:
         """
@@ -123,15 +658,48 @@ class RecommendationEngine:
         return {
             "bandit_stats": self.bandit.get_stats(),
             "epsilon": self.bandit.epsilon,
-            "ab_test_variant": self.ab_test_variant,
+            "ab_test": {
+                **self.ab_test.summary(),
+                "bandits": {
+                    variant: {
+                        "epsilon": bandit.epsilon,
+                        "bandit_stats": bandit.get_stats(),
+                        "contextual_bandit": self.contextual_bandits[variant].get_stats(),
+                    }
+                    for variant, bandit in self.bandits.items()
+                },
+            },
+            "bandit_policies": dict(self.bandit_policies),
+            "contextual_bandit": self.contextual_bandit.get_stats(),
             "device": str(self.device),
+            "recommendation_cache": self.recommendation_cache.stats(),
         }
 
-    def set_ab_variant(self, variant: str):
+    def set_bandit_policy(self, resource_type: str, policy: str):
+        """
+        Choose how the bandit reranks recommendations of one resource type:
+        "ucb" (epsilon-greedy UCB), "thompson" (Beta-Bernoulli),
+        "gaussian_thompson" or "linucb" (contextual).
+        """
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(f"Unknown resource type: {resource_type}")
+        if policy not in BANDIT_POLICIES:
+            raise ValueError(f"policy must be one of {', '.join(BANDIT_POLICIES)}")
+
+        self.bandit_policies[resource_type] = policy
+        self.recommendation_cache.invalidate(resource_type)
+
+    def set_ab_variant(self, variant: Optional[str]):
+        """
+        Force every individual into one A/B variant (None resumes the split).
+        """
+        self.ab_test.configure(forced=variant)
+        self.recommendation_cache.invalidate()
+
+    def set_ab_split(self, split: float):
         """
-        Set A/B testing variant.
+        Run the A/B test: send this share of individuals to variant B.
+        Clears a forced variant.
         """
-        self.ab_test_variant = variant
-        if variant == "B":
-            # Variant B: More exploration
-            self.bandit.epsilon = min(0.2, self.bandit.epsilon * 1.5)
\ No newline at end of file
+        self.ab_test.configure(split=split)
+        self.recommendation_cache.invalidate()
\ No newline at end of file
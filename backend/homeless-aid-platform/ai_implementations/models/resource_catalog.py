@@ -0,0 +1,98 @@
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class ResourceCatalog:
+    """
+    In-process, versioned catalog of resources of one type (shelters,
+    jobs, training programs). Recommendation requests rank against the
+    catalog by reference instead of posting the full resource list.
+    Every change bumps `version`; listeners are told about upserts and
+    deletions so derived indexes stay in sync incrementally.
+    """
+
+    def __init__(self, resource_type: str):
+        self.resource_type = resource_type
+        self.version = 0
+
+        self._resources: Dict[str, Dict] = {}
+        self._snapshot: Optional[Tuple[int, List[Dict]]] = None
+        self._lock = threading.RLock()
+        self._listeners: List[Tuple[Callable, Callable]] = []
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def add_listener(
+        self,
+        on_upsert: Callable[[List[Dict]], None],
+        on_delete: Callable[[List[str]], None],
+    ):
+        """Register callbacks invoked (under the catalog lock) on every change."""
+        self._listeners.append((on_upsert, on_delete))
+
+    def load(self, resources: List[Dict]) -> int:
+        """Replace the whole catalog. Returns the new version."""
+        self._validate(resources)
+        with self._lock:
+            new_ids = {r["id"] for r in resources}
+            removed = [rid for rid in self._resources if rid not in new_ids]
+
+            self._resources = {r["id"]: r for r in resources}
+            return self._changed(resources, removed)
+
+    def upsert(self, resources: List[Dict]) -> int:
+        """Add or replace resources by id. Returns the new version."""
+        self._validate(resources)
+        with self._lock:
+            for resource in resources:
+                self._resources[resource["id"]] = resource
+            return self._changed(resources, [])
+
+    def delete(self, resource_ids: List[str]) -> int:
+        """Remove resources by id (unknown ids are ignored). Returns the new version."""
+        with self._lock:
+            removed = [rid for rid in resource_ids if self._resources.pop(rid, None) is not None]
+            if not removed:
+                return self.version
+            return self._changed([], removed)
+
+    def get(self, resource_id: str) -> Optional[Dict]:
+        return self._resources.get(resource_id)
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """
+        Current (version, resources). The list is built once per version and
+        shared between requests, so callers must not mutate it.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == self.version:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._snapshot[0] != self.version:
+                self._snapshot = (self.version, list(self._resources.values()))
+            return self._snapshot
+
+    def info(self) -> Dict:
+        return {
+            "resource_type": self.resource_type,
+            "version": self.version,
+            "count": len(self._resources),
+        }
+
+    def _changed(self, upserted: List[Dict], removed: List[str]) -> int:
+        """Notify listeners and bump the version (caller holds the lock)."""
+        for on_upsert, on_delete in self._listeners:
+            if removed:
+                on_delete(removed)
+            if upserted:
+                on_upsert(upserted)
+        self.version += 1
+        return self.version
+
+    @staticmethod
+    def _validate(resources: List[Dict]):
+        for resource in resources:
+            if not isinstance(resource, dict) or "id" not in resource:
+                raise ValueError("Every resource must be an object with an 'id'")
@@ -0,0 +1,106 @@
+"""
+Microbenchmark for RiskPredictor on synthetic profiles.
+
+Times comprehensive_risk_assessment one profile at a time and
+assess_many over the whole batch, with whatever models load_models
+finds (rule-based fallbacks otherwise).
+
+    python -m models.risk_benchmark --profiles 5000 --repeat 3
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from models.risk_predictor import RiskPredictor
+
+EDUCATION = [
+    "Less than High School",
+    "High School/GED",
+    "Some College",
+    "Associate Degree",
+    "Bachelor Degree",
+    "",
+]
+DURATIONS = [
+    "First time",
+    "Less than 6 months",
+    "6-12 months",
+    "1-2 years",
+    "More than 2 years",
+    "",
+]
+HEALTH = [[], ["Chronic pain"], ["Mental health"], ["Substance abuse", "Disability"]]
+NLP_ANALYSES = [
+    None,
+    {"urgency_level": "critical", "sentiment": {"mental_health_risk": "high"}},
+    {"urgency_level": "medium", "sentiment": {"mental_health_risk": "low"}},
+]
+
+
+def synthetic_profiles(n: int, seed: int = 0) -> List[Dict]:
+    """Random profiles covering every branch of the rules and explanations."""
+    rng = random.Random(seed)
+    return [
+        {
+            "age": rng.randint(18, 75),
+            "skills": ["skill"] * rng.randint(0, 6),
+            "education": rng.choice(EDUCATION),
+            "work_experience_years": rng.randint(0, 25),
+            "has_transportation": rng.random() < 0.5,
+            "has_phone": rng.random() < 0.7,
+            "has_id": rng.random() < 0.6,
+            "health_conditions": rng.choice(HEALTH),
+            "duration_homeless": rng.choice(DURATIONS),
+            "substance_abuse": rng.random() < 0.3,
+            "mental_health_issues": rng.random() < 0.3,
+            "chronic_health_conditions": rng.random() < 0.2,
+            "family_support": rng.random() < 0.4,
+            "criminal_history": rng.random() < 0.2,
+            "previous_shelter_stays": [None] * rng.randint(0, 5),
+            "current_situation": rng.choice(["Street", "Shelter", "Vehicle"]),
+            "urgent_needs": rng.choice([[], ["Medical Care"], ["Food"]]),
+        }
+        for _ in range(n)
+    ]
+
+
+def _best_of(repeat: int, run) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    predictor = RiskPredictor()
+    profiles = synthetic_profiles(args.profiles, args.seed)
+    rng = random.Random(args.seed)
+    nlp_analyses = [rng.choice(NLP_ANALYSES) for _ in profiles]
+
+    single = _best_of(
+        args.repeat,
+        lambda: [
+            predictor.comprehensive_risk_assessment(p, nlp)
+            for p, nlp in zip(profiles, nlp_analyses)
+        ],
+    )
+    batch = _best_of(args.repeat, lambda: predictor.assess_many(profiles, nlp_analyses))
+
+    n = len(profiles)
+    print(f"{n} profiles, best of {args.repeat}")
+    print(f"comprehensive_risk_assessment: {single:.3f}s ({single / n * 1e6:.1f} µs/profile)")
+    print(f"assess_many:                   {batch:.3f}s ({batch / n * 1e6:.1f} µs/profile)")
+
+
+if __name__ == "__main__":
+    main()
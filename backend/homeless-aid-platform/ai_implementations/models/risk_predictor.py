@@ -5,6 +5,20 @@ from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
 import pickle
 import os
+from models.risk_predictor_helpers import (
+    ParsedProfile,
+    calculate_overall_risk,
+    chronic_risk_interventions,
+    explain_chronic_risk,
+    explain_intervention_need,
+    explain_job_prediction,
+    get_immediate_actions,
+    job_features,
+    job_recommendations,
+    load_models,
+    profile_list,
+    profile_number,
+)
 
 
 class RiskPredictor:
@@ -39,41 +53,59 @@ class RiskPredictor:
         """
         Predict likelihood of successful job placement.
         """
-        features = self._extract_job_features(profile)
+        return self._predict_job(ParsedProfile(profile))
+
+    def _predict_job(self, parsed: ParsedProfile) -> Dict:
+        profile = parsed.profile
+        features = self._extract_job_features(profile, parsed)
 
         if self.job_placement_model:
             probability = self.job_placement_model.predict_proba([features])[0][1]
         else:
             # Rule-based fallback
-            probability = self._rule_based_job_prediction(profile)
+            probability = self._rule_based_job_prediction(profile, parsed)
+
+        return self._job_result(profile, probability, parsed)
 
+    def _job_result(
+        self, profile: Dict, probability: float, parsed: ParsedProfile = None
+    ) -> Dict:
         risk_level = self._categorize_probability(probability, "job_placement")
 
         return {
             "probability": round(probability, 3),
             "risk_level": risk_level,
-            "factors": self._explain_job_prediction(profile, probability),
-            "recommendations": self._job_recommendations(profile, probability),
+            "factors": explain_job_prediction(profile, probability, parsed),
+            "recommendations": job_recommendations(profile, probability, parsed),
         }
 
     def predict_chronic_homelessness_risk(self, profile: Dict) -> Dict:
         """
         Identify individuals at high risk of chronic homelessness.
         """
-        features = self._extract_chronic_risk_features(profile)
+        return self._predict_chronic(ParsedProfile(profile))
+
+    def _predict_chronic(self, parsed: ParsedProfile) -> Dict:
+        profile = parsed.profile
+        features = self._extract_chronic_risk_features(profile, parsed)
 
         if self.chronic_risk_model:
             probability = self.chronic_risk_model.predict_proba([features])[0][1]
         else:
-            probability = self._rule_based_chronic_risk(profile)
+            probability = self._rule_based_chronic_risk(profile, parsed)
+
+        return self._chronic_result(profile, probability, parsed)
 
+    def _chronic_result(
+        self, profile: Dict, probability: float, parsed: ParsedProfile = None
+    ) -> Dict:
         risk_level = self._categorize_probability(probability, "chronic_risk")
 
         return {
             "probability": round(probability, 3),
             "risk_level": risk_level,
-            "factors": self._explain_chronic_risk(profile, probability),
-            "interventions": self._chronic_risk_interventions(risk_level),
+            "factors": explain_chronic_risk(profile, probability, parsed),
+            "interventions": chronic_risk_interventions(risk_level),
         }
 
     def flag_immediate_intervention(
@@ -89,6 +121,11 @@ class RiskPredictor:
         else:
             probability = self._rule_based_intervention(profile, nlp_analysis)
 
+        return self._intervention_result(profile, nlp_analysis, probability)
+
+    def _intervention_result(
+        self, profile: Dict, nlp_analysis: Dict, probability: float
+    ) -> Dict:
         requires_intervention = probability > self.thresholds["intervention"]["medium"]
         urgency = self._categorize_probability(probability, "intervention")
 
@@ -96,10 +133,8 @@ class RiskPredictor:
             "requires_intervention": requires_intervention,
             "urgency": urgency,
             "probability": round(probability, 3),
-            "reasons": self._explain_intervention_need(profile, nlp_analysis),
-            "immediate_actions": self._get_immediate_actions(
-                urgency, profile, nlp_analysis
-            ),
+            "reasons": explain_intervention_need(profile, nlp_analysis),
+            "immediate_actions": get_immediate_actions(urgency, profile, nlp_analysis),
         }
 
     def comprehensive_risk_assessment(
@@ -107,28 +142,101 @@ class RiskPredictor:
     ) -> Dict:
         """
         Complete risk assessment combining all predictors.
+        The profile is parsed once and shared by every predictor.
         """
+        parsed = ParsedProfile(profile)
         return {
-            "job_placement": self.predict_job_placement_success(profile),
-            "chronic_homelessness": self.predict_chronic_homelessness_risk(profile),
+            "job_placement": self._predict_job(parsed),
+            "chronic_homelessness": self._predict_chronic(parsed),
             "immediate_intervention": self.flag_immediate_intervention(
                 profile, nlp_analysis
             ),
-            "overall_risk_score": self._calculate_overall_risk(profile, nlp_analysis),
+            "overall_risk_score": calculate_overall_risk(profile, nlp_analysis, parsed),
         }
 
-    def _extract_job_features(self, profile: Dict) -> List[float]:
-        """Extract features for job placement prediction. GPU-accelerated."""
-        features = [
-            profile.get("age", 40) / 100.0,
-            len(profile.get("skills", [])) / 10.0,
-            self._encode_education(profile.get("education", "")),
-            profile.get("work_experience_years", 0) / 20.0,
-            1.0 if profile.get("has_transportation", False) else 0.0,
-            1.0 if profile.get("has_phone", False) else 0.0,
-            1.0 if profile.get("has_id", False) else 0.0,
-            self._encode_health_status(profile.get("health_conditions", [])),
+    def assess_many(
+        self, profiles: List[Dict], nlp_analyses: List[Dict] = None
+    ) -> List[Dict]:
+        """
+        comprehensive_risk_assessment for many profiles at once.
+        Feature matrices are built for the whole batch and each model's
+        predict_proba runs once per batch instead of once per profile.
+        """
+        if nlp_analyses is None:
+            nlp_analyses = [None] * len(profiles)
+        if len(nlp_analyses) != len(profiles):
+            raise ValueError("nlp_analyses must have one entry per profile")
+
+        for n, profile in enumerate(profiles):
+            if not isinstance(profile, dict):
+                raise ValueError(f"Profile {n} must be an object")
+
+        parsed_profiles = [ParsedProfile(p) for p in profiles]
+
+        job_probabilities = self._predict_batch(
+            self.job_placement_model,
+            lambda: [job_features(pp.profile, pp) for pp in parsed_profiles],
+            lambda: [
+                self._rule_based_job_prediction(pp.profile, pp)
+                for pp in parsed_profiles
+            ],
+        )
+        chronic_probabilities = self._predict_batch(
+            self.chronic_risk_model,
+            lambda: [
+                self._extract_chronic_risk_features(pp.profile, pp)
+                for pp in parsed_profiles
+            ],
+            lambda: [
+                self._rule_based_chronic_risk(pp.profile, pp)
+                for pp in parsed_profiles
+            ],
+        )
+        intervention_probabilities = self._predict_batch(
+            self.intervention_model,
+            lambda: [
+                self._extract_intervention_features(p, nlp)
+                for p, nlp in zip(profiles, nlp_analyses)
+            ],
+            lambda: [
+                self._rule_based_intervention(p, nlp)
+                for p, nlp in zip(profiles, nlp_analyses)
+            ],
+        )
+
+        return [
+            {
+                "job_placement": self._job_result(
+                    profile, job_probabilities[i], parsed_profiles[i]
+                ),
+                "chronic_homelessness": self._chronic_result(
+                    profile, chronic_probabilities[i], parsed_profiles[i]
+                ),
+                "immediate_intervention": self._intervention_result(
+                    profile, nlp_analyses[i], intervention_probabilities[i]
+                ),
+                "overall_risk_score": calculate_overall_risk(
+                    profile, nlp_analyses[i], parsed_profiles[i]
+                ),
+            }
+            for i, profile in enumerate(profiles)
         ]
+
+    @staticmethod
+    def _predict_batch(model, build_features, rule_based) -> List[float]:
+        """Positive-class probabilities from one predict_proba call, or the rules."""
+        if not model:
+            return rule_based()
+        features = np.asarray(build_features(), dtype=np.float64)
+        if len(features) == 0:
+            return []
+        return model.predict_proba(features)[:, 1].tolist()
+
+    def _extract_job_features(
+        self, profile: Dict, parsed: ParsedProfile = None
+    ) -> List[float]:
+        """Extract features for job placement prediction. GPU-accelerated."""
+        features = job_features(profile, parsed)
         
         # Convert to tensor for GPU processing if needed for batch operations
         if hasattr(self, '_batch_mode') and self._batch_mode:
@@ -136,17 +244,20 @@ class RiskPredictor:
         
         return features
 
-    def _extract_chronic_risk_features(self, profile: Dict) -> List[float]:
+    def _extract_chronic_risk_features(
+        self, profile: Dict, parsed: ParsedProfile = None
+    ) -> List[float]:
         """Extract features for chronic homelessness risk."""
-        duration_months = self._parse_duration(profile.get("duration_homeless", ""))
+        if parsed is None:
+            parsed = ParsedProfile(profile)
 
         features = [
-            duration_months / 24.0,  # Normalize to 2 years
-            profile.get("age", 40) / 100.0,
+            parsed.duration_months / 24.0,  # Normalize to 2 years
+            parsed.age_or(40) / 100.0,
             1.0 if profile.get("substance_abuse", False) else 0.0,
             1.0 if profile.get("mental_health_issues", False) else 0.0,
             1.0 if profile.get("chronic_health_conditions", False) else 0.0,
-            len(profile.get("previous_shelter_stays", [])) / 10.0,
+            parsed.shelter_stays_count / 10.0,
             1.0 if profile.get("criminal_history", False) else 0.0,
             1.0 if profile.get("family_support", False) else 0.0,
         ]
@@ -166,20 +277,24 @@ class RiskPredictor:
             and nlp_analysis.get("sentiment", {}).get("mental_health_risk") == "high"
             else 0.0,
             1.0 if profile.get("medications_needed", False) else 0.0,
-            1.0 if "Medical Care" in profile.get("urgent_needs", []) else 0.0,
-            profile.get("age", 40) / 100.0,
+            1.0 if "Medical Care" in profile_list(profile, "urgent_needs") else 0.0,
+            profile_number(profile, "age", 40) / 100.0,
             1.0 if profile.get("has_disability", False) else 0.0,
         ]
         return features
 
-    def _rule_based_job_prediction(self, profile: Dict) -> float:
+    def _rule_based_job_prediction(
+        self, profile: Dict, parsed: ParsedProfile = None
+    ) -> float:
         """Rule-based job placement prediction."""
+        if parsed is None:
+            parsed = ParsedProfile(profile)
         score = 0.5
 
         # Positive factors
-        if profile.get("age", 100) < 50:
+        if parsed.age is not None and parsed.age < 50:
             score += 0.1
-        if len(profile.get("skills", [])) > 2:
+        if parsed.skills_count > 2:
             score += 0.15
         if profile.get("education") in [
             "Bachelor Degree",
@@ -187,7 +302,7 @@ class RiskPredictor:
             "Some College",
         ]:
             score += 0.1
-        if profile.get("work_experience_years", 0) > 2:
+        if parsed.work_experience_years > 2:
             score += 0.1
         if profile.get("has_transportation"):
             score += 0.05
@@ -202,11 +317,15 @@ class RiskPredictor:
 
         return max(0.0, min(1.0, score))
 
-    def _rule_based_chronic_risk(self, profile: Dict) -> float:
+    def _rule_based_chronic_risk(
+        self, profile: Dict, parsed: ParsedProfile = None
+    ) -> float:
         """Rule-based chronic homelessness risk."""
+        if parsed is None:
+            parsed = ParsedProfile(profile)
         score = 0.3
 
-        duration_months = self._parse_duration(profile.get("duration_homeless", ""))
+        duration_months = parsed.duration_months
         if duration_months > 12:
             score += 0.3
         elif duration_months > 6:
@@ -216,7 +335,7 @@ class RiskPredictor:
             score += 0.2
         if profile.get("mental_health_issues"):
             score += 0.15
-        if profile.get("age", 0) > 50:
+        if parsed.age is not None and parsed.age > 50:
             score += 0.1
         if not profile.get("family_support"):
             score += 0.1
@@ -238,7 +357,7 @@ class RiskPredictor:
             and nlp_analysis.get("sentiment", {}).get("mental_health_risk") == "high"
         ):
             score += 0.25
-        if "Medical Care" in profile.get("urgent_needs", []):
+        if "Medical Care" in profile_list(profile, "urgent_needs"):
             score += 0.15
 
         return max(0.0, min(1.0, score))
@@ -253,76 +372,14 @@ class RiskPredictor:
         else:
             return "low"
 
-    def _encode_education(self, education: str) -> float:
-        """Encode education level as numeric value."""
-        from models.risk_predictor_helpers import encode_education
-
-        return encode_education(education)
-
-    def _encode_health_status(self, health_conditions: List[str]) -> float:
-        """Encode health status as numeric value."""
-        from models.risk_predictor_helpers import encode_health_status
-
-        return encode_health_status(health_conditions)
-
-    def _parse_duration(self, duration_str: str) -> int:
-        """Parse duration string to months."""
-        from models.risk_predictor_helpers import parse_duration
-
-        return parse_duration(duration_str)
-
-    def _explain_job_prediction(self, profile: Dict, probability: float) -> List[str]:
-        """Explain job prediction factors."""
-        from models.risk_predictor_helpers import explain_job_prediction
-
-        return explain_job_prediction(profile, probability)
-
-    def _job_recommendations(self, profile: Dict, probability: float) -> List[str]:
-        """Generate job recommendations."""
-        from models.risk_predictor_helpers import job_recommendations
-
-        return job_recommendations(profile, probability)
-
-    def _explain_chronic_risk(self, profile: Dict, probability: float) -> List[str]:
-        """Explain chronic risk factors."""
-        from models.risk_predictor_helpers import explain_chronic_risk
-
-        return explain_chronic_risk(profile, probability)
-
-    def _chronic_risk_interventions(self, risk_level: str) -> List[str]:
-        """Get chronic risk interventions."""
-        from models.risk_predictor_helpers import chronic_risk_interventions
-
-        return chronic_risk_interventions(risk_level)
-
-    def _explain_intervention_need(
-        self, profile: Dict, nlp_analysis: Dict = None
-    ) -> List[str]:
-        """Explain intervention need."""
-        from models.risk_predictor_helpers import explain_intervention_need
-
-        return explain_intervention_need(profile, nlp_analysis)
-
-    def _get_immediate_actions(
-        self, urgency: str, profile: Dict, nlp_analysis: Dict = None
-    ) -> List[str]:
-        """Get immediate actions."""
-        from models.risk_predictor_helpers import get_immediate_actions
-
-        return get_immediate_actions(urgency, profile, nlp_analysis)
-
-    def _calculate_overall_risk(
-        self, profile: Dict, nlp_analysis: Dict = None
-    ) -> float:
-        """Calculate overall risk score."""
-        from models.risk_predictor_helpers import calculate_overall_risk
-
-        return calculate_overall_risk(profile, nlp_analysis)
+    def _duration_months(self, profile: Dict, parsed: ParsedProfile = None) -> int:
+        """Months homeless, reusing the parsed profile when there is one."""
+        if parsed is not None:
+            return parsed.duration_months
+        return ParsedProfile(profile).duration_months
 
     def _load_models(self):
         """Load pre-trained models if available."""
-        from models.risk_predictor_helpers import load_models
-
         models = load_models()
         self.job_placement_model = models.get("job_placement")
         self.chronic_risk_model = models.get("chronic_risk")
@@ -1,5 +1,7 @@
 """Helper methods for RiskPredictor class."""
 
+import math
+from functools import lru_cache
 from typing import Dict, List
 
 
@@ -13,73 +15,157 @@ def categorize_probability(probability: float, thresholds: Dict) -> str:
         return "low"
 
 
+# Lookup tables, built once at import
+EDUCATION_SCORES = {
+    "Less than High School": 0.2,
+    "High School/GED": 0.4,
+    "Some College": 0.6,
+    "Associate Degree": 0.7,
+    "Bachelor Degree": 0.9,
+    "Graduate Degree": 1.0,
+}
+
+HEALTH_SEVERITY = (
+    ("mental health", 0.3),
+    ("substance abuse", 0.4),
+    ("chronic", 0.3),
+    ("disability", 0.2),
+)
+
+# (phrases, months), checked in order; anything else counts as 6 months
+DURATION_RULES = (
+    (("first time",), 0),
+    (("less than 6", "< 6"), 3),
+    (("6-12", "6 to 12"), 9),
+    (("1-2 year",), 18),
+    (("more than 2", "> 2", "chronic"), 30),
+)
+
+
 def encode_education(education: str) -> float:
     """Encode education level as numeric value."""
-    education_map = {
-        "Less than High School": 0.2,
-        "High School/GED": 0.4,
-        "Some College": 0.6,
-        "Associate Degree": 0.7,
-        "Bachelor Degree": 0.9,
-        "Graduate Degree": 1.0,
-    }
-    return education_map.get(education, 0.4)
+    if not isinstance(education, str):
+        return 0.4
+    return EDUCATION_SCORES.get(education, 0.4)
 
 
 def encode_health_status(health_conditions: List[str]) -> float:
     """Encode health status as numeric value."""
-    if not health_conditions:
+    if not health_conditions or not isinstance(health_conditions, (list, tuple)):
         return 1.0
 
-    severity_map = {
-        "mental health": 0.3,
-        "substance abuse": 0.4,
-        "chronic": 0.3,
-        "disability": 0.2,
-    }
-
     total_impact = 0.0
     for condition in health_conditions:
+        if not isinstance(condition, str):
+            continue
         condition_lower = condition.lower()
-        for key, impact in severity_map.items():
+        for key, impact in HEALTH_SEVERITY:
             if key in condition_lower:
                 total_impact += impact
 
     return max(0.0, 1.0 - min(total_impact, 0.8))
 
 
+def profile_number(profile: Dict, key: str, default: float) -> float:
+    """A numeric profile field; missing, null or non-numeric values give the default."""
+    value = profile.get(key)
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if math.isfinite(number) else default
+
+
+def profile_list(profile: Dict, key: str) -> List:
+    """A list profile field; missing, null or non-list values give []."""
+    value = profile.get(key)
+    return value if isinstance(value, (list, tuple)) else []
+
+
+def job_features(profile: Dict, parsed: "ParsedProfile" = None) -> List[float]:
+    """
+    Numeric profile features used for job placement prediction and as the
+    individual's part of the contextual bandit's context vector. Null or
+    malformed fields fall back to their defaults.
+    """
+    if parsed is None:
+        parsed = ParsedProfile(profile)
+
+    return [
+        parsed.age_or(40) / 100.0,
+        parsed.skills_count / 10.0,
+        parsed.education_score,
+        parsed.work_experience_years / 20.0,
+        1.0 if profile.get("has_transportation", False) else 0.0,
+        1.0 if profile.get("has_phone", False) else 0.0,
+        1.0 if profile.get("has_id", False) else 0.0,
+        parsed.health_score,
+    ]
+
+
+@lru_cache(maxsize=1024)
 def parse_duration(duration_str: str) -> int:
-    """Parse duration string to months."""
+    """Parse duration string to months (memoized; the phrases are few)."""
     duration_lower = duration_str.lower()
 
-    if "first time" in duration_lower:
-        return 0
-    elif "less than 6" in duration_lower or "< 6" in duration_lower:
-        return 3
-    elif "6-12" in duration_lower or "6 to 12" in duration_lower:
-        return 9
-    elif "1-2 year" in duration_lower:
-        return 18
-    elif (
-        "more than 2" in duration_lower
-        or "> 2" in duration_lower
-        or "chronic" in duration_lower
-    ):
-        return 30
+    for phrases, months in DURATION_RULES:
+        if any(phrase in duration_lower for phrase in phrases):
+            return months
 
     return 6
 
 
-def explain_job_prediction(profile: Dict, probability: float) -> List[str]:
+class ParsedProfile:
+    """
+    Derived values of a profile, computed once per assessment and shared
+    by the feature extractors, rules and explanations. Null or malformed
+    fields are normalized here as if they were missing; age stays None
+    then, so the rules that compare it do not fire.
+    """
+
+    __slots__ = (
+        "profile",
+        "age",
+        "skills_count",
+        "work_experience_years",
+        "shelter_stays_count",
+        "duration_months",
+        "education_score",
+        "health_score",
+    )
+
+    def __init__(self, profile: Dict):
+        self.profile = profile
+        self.age = profile_number(profile, "age", None)
+        self.skills_count = len(profile_list(profile, "skills"))
+        self.work_experience_years = profile_number(profile, "work_experience_years", 0)
+        self.shelter_stays_count = len(profile_list(profile, "previous_shelter_stays"))
+        duration = profile.get("duration_homeless")
+        self.duration_months = parse_duration(duration if isinstance(duration, str) else "")
+        self.education_score = encode_education(profile.get("education", ""))
+        self.health_score = encode_health_status(profile.get("health_conditions", []))
+
+    def age_or(self, default: float) -> float:
+        return default if self.age is None else self.age
+
+
+def explain_job_prediction(
+    profile: Dict, probability: float, parsed: ParsedProfile = None
+) -> List[str]:
     """Explain factors affecting job placement prediction."""
     factors = []
 
-    if profile.get("age", 100) < 40:
+    if parsed is None:
+        parsed = ParsedProfile(profile)
+    age = parsed.age
+    if age is not None and age < 40:
         factors.append("Age favorable for employment")
-    elif profile.get("age", 0) > 55:
+    elif age is not None and age > 55:
         factors.append("Age may present employment challenges")
 
-    skills_count = len(profile.get("skills", []))
+    skills_count = parsed.skills_count
     if skills_count > 3:
         factors.append(f"Strong skill set ({skills_count} skills)")
     elif skills_count == 0:
@@ -97,14 +183,19 @@ def explain_job_prediction(profile: Dict, probability: float) -> List[str]:
     return factors
 
 
-def job_recommendations(profile: Dict, probability: float) -> List[str]:
+def job_recommendations(
+    profile: Dict, probability: float, parsed: ParsedProfile = None
+) -> List[str]:
     """Generate recommendations to improve job placement success."""
     recommendations = []
 
+    if parsed is None:
+        parsed = ParsedProfile(profile)
+
     if not profile.get("has_id"):
         recommendations.append("Assist with obtaining ID documents")
 
-    if len(profile.get("skills", [])) < 2:
+    if parsed.skills_count < 2:
         recommendations.append("Enroll in skills training program")
 
     if not profile.get("has_transportation"):
@@ -119,11 +210,15 @@ def job_recommendations(profile: Dict, probability: float) -> List[str]:
     return recommendations
 
 
-def explain_chronic_risk(profile: Dict, probability: float) -> List[str]:
+def explain_chronic_risk(
+    profile: Dict, probability: float, parsed: ParsedProfile = None
+) -> List[str]:
     """Explain chronic homelessness risk factors."""
     factors = []
 
-    duration_months = parse_duration(profile.get("duration_homeless", ""))
+    if parsed is None:
+        parsed = ParsedProfile(profile)
+    duration_months = parsed.duration_months
     if duration_months > 12:
         factors.append(f"Extended homelessness duration ({duration_months} months)")
 
@@ -136,38 +231,40 @@ def explain_chronic_risk(profile: Dict, probability: float) -> List[str]:
     if not profile.get("family_support"):
         factors.append("Limited family support network")
 
-    if profile.get("age", 0) > 50:
+    if parsed.age is not None and parsed.age > 50:
         factors.append("Age increases vulnerability")
 
     return factors
 
 
+CHRONIC_INTERVENTIONS = {
+    "high": [
+        "Immediate case management assignment",
+        "Housing First program enrollment",
+        "Intensive mental health/substance abuse treatment",
+        "Weekly check-ins and support",
+        "Connect with disability services if applicable",
+    ],
+    "medium": [
+        "Regular case management",
+        "Transitional housing program",
+        "Mental health/substance abuse counseling",
+        "Job training and placement services",
+        "Bi-weekly check-ins",
+    ],
+    "low": [
+        "Standard case management",
+        "Job placement assistance",
+        "Life skills training",
+        "Monthly check-ins",
+        "Connect with community resources",
+    ],
+}
+
+
 def chronic_risk_interventions(risk_level: str) -> List[str]:
     """Recommend interventions based on chronic risk level."""
-    interventions = {
-        "high": [
-            "Immediate case management assignment",
-            "Housing First program enrollment",
-            "Intensive mental health/substance abuse treatment",
-            "Weekly check-ins and support",
-            "Connect with disability services if applicable",
-        ],
-        "medium": [
-            "Regular case management",
-            "Transitional housing program",
-            "Mental health/substance abuse counseling",
-            "Job training and placement services",
-            "Bi-weekly check-ins",
-        ],
-        "low": [
-            "Standard case management",
-            "Job placement assistance",
-            "Life skills training",
-            "Monthly check-ins",
-            "Connect with community resources",
-        ],
-    }
-    return interventions.get(risk_level, interventions["medium"])
+    return list(CHRONIC_INTERVENTIONS.get(risk_level, CHRONIC_INTERVENTIONS["medium"]))
 
 
 def explain_intervention_need(profile: Dict, nlp_analysis: Dict = None) -> List[str]:
@@ -184,7 +281,7 @@ def explain_intervention_need(profile: Dict, nlp_analysis: Dict = None) -> List[
         if nlp_analysis.get("sentiment", {}).get("mental_health_risk") == "high":
             reasons.append("High mental health risk detected")
 
-    if "Medical Care" in profile.get("urgent_needs", []):
+    if "Medical Care" in profile_list(profile, "urgent_needs"):
         reasons.append("Urgent medical needs identified")
 
     if profile.get("medications_needed") and not profile.get("medication_access"):
@@ -193,47 +290,54 @@ def explain_intervention_need(profile: Dict, nlp_analysis: Dict = None) -> List[
     return reasons
 
 
+IMMEDIATE_ACTIONS = {
+    "high": [
+        "Contact emergency services if life-threatening",
+        "Arrange immediate shelter placement",
+        "Schedule urgent medical evaluation",
+        "Assign crisis counselor",
+        "Provide emergency supplies (food, water, blanket)",
+    ],
+    "medium": [
+        "Schedule intake within 24 hours",
+        "Arrange temporary shelter",
+        "Connect with medical services",
+        "Provide basic necessities",
+        "Begin case management process",
+    ],
+    "low": [
+        "Schedule standard intake",
+        "Provide resource information",
+        "Add to case management queue",
+        "Offer basic services",
+    ],
+}
+
+
 def get_immediate_actions(
     urgency: str, profile: Dict, nlp_analysis: Dict = None
 ) -> List[str]:
     """Get immediate actions based on urgency level."""
-    actions = {
-        "high": [
-            "Contact emergency services if life-threatening",
-            "Arrange immediate shelter placement",
-            "Schedule urgent medical evaluation",
-            "Assign crisis counselor",
-            "Provide emergency supplies (food, water, blanket)",
-        ],
-        "medium": [
-            "Schedule intake within 24 hours",
-            "Arrange temporary shelter",
-            "Connect with medical services",
-            "Provide basic necessities",
-            "Begin case management process",
-        ],
-        "low": [
-            "Schedule standard intake",
-            "Provide resource information",
-            "Add to case management queue",
-            "Offer basic services",
-        ],
-    }
-    return actions.get(urgency, actions["medium"])
-
-
-def calculate_overall_risk(profile: Dict, nlp_analysis: Dict = None) -> float:
+    return list(IMMEDIATE_ACTIONS.get(urgency, IMMEDIATE_ACTIONS["medium"]))
+
+
+def calculate_overall_risk(
+    profile: Dict, nlp_analysis: Dict = None, parsed: ParsedProfile = None
+) -> float:
     """Calculate overall risk score combining all factors."""
+    if parsed is None:
+        parsed = ParsedProfile(profile)
+
     # Weighted combination of different risk factors
-    job_features = [
-        profile.get("age", 40) / 100.0,
-        len(profile.get("skills", [])) / 10.0,
-        encode_education(profile.get("education", "")),
+    employment_features = [
+        parsed.age_or(40) / 100.0,
+        parsed.skills_count / 10.0,
+        parsed.education_score,
     ]
-    job_risk = 1.0 - (sum(job_features) / len(job_features))
+    job_risk = 1.0 - (sum(employment_features) / len(employment_features))
 
     chronic_features = [
-        parse_duration(profile.get("duration_homeless", "")) / 24.0,
+        parsed.duration_months / 24.0,
         1.0 if profile.get("substance_abuse") else 0.0,
         1.0 if profile.get("mental_health_issues") else 0.0,
     ]
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import heapq
 from dataclasses import dataclass
 from config import Config
+from models.geo import haversine_km
 
 
 @dataclass
@@ -480,32 +481,11 @@ class RouteOptimizer:
     def _haversine_distance(
         self, loc1: Tuple[float, float], loc2: Tuple[float, float]
     ) -> float:
-        """Calculate distance between two points using Haversine formula. GPU-accelerated."""
-        # Convert to tensors for GPU computation
+        """Calculate distance between two points using Haversine formula."""
         lat1, lon1 = loc1
         lat2, lon2 = loc2
 
-        R = 6371  # Earth's radius in km
-
-        # Use PyTorch for GPU-accelerated trigonometric operations
-        lat1_t = torch.tensor(np.radians(lat1), device=self.device, dtype=torch.float32)
-        lon1_t = torch.tensor(np.radians(lon1), device=self.device, dtype=torch.float32)
-        lat2_t = torch.tensor(np.radians(lat2), device=self.device, dtype=torch.float32)
-        lon2_t = torch.tensor(np.radians(lon2), device=self.device, dtype=torch.float32)
-
-        dlat = lat2_t - lat1_t
-        dlon = lon2_t - lon1_t
-
-        a = (
-            torch.sin(dlat / 2) ** 2
-            + torch.cos(lat1_t)
-            * torch.cos(lat2_t)
-            * torch.sin(dlon / 2) ** 2
-        )
-
-        c = 2 * torch.atan2(torch.sqrt(a), torch.sqrt(1 - a))
-
-        return (R * c).item()
+        return float(haversine_km(lat1, lon1, lat2, lon2))
 
     def _estimate_travel_time(self, distance_km: float, transport_mode: str) -> int:
         """Estimate travel time in minutes."""
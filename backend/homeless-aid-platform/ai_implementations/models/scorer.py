@@ -1,17 +1,25 @@
+import atexit
 import numpy as np
 import torch
 from typing import Dict, List
 from scipy.spatial.distance import euclidean
 from config import Config
+from models.geo import distance_decay, haversine_km, location_arrays
+from models.skill_embeddings import SkillEmbeddingCache
+from models.skill_index import ResourceSkillIndex
+from models.skill_synonyms import SkillSynonymIndex
 
 # Try to import sentence transformers for semantic similarity
 try:
-    from sentence_transformers import SentenceTransformer, util
+    from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     print("⚠️  sentence-transformers not available, using fallback skill matching")
 
+PRIORITY_LEVELS = ("low", "medium", "high", "critical")
+PRIORITY_ROWS = {level: idx for idx, level in enumerate(PRIORITY_LEVELS)}
+
 
 class RecommendationScorer:
     """
@@ -19,7 +27,7 @@ class RecommendationScorer:
     GPU-accelerated for batch scoring operations.
     """
 
-    def __init__(self, bandit=None, device=None):
+    def __init__(self, bandit=None, device=None, skill_cache_path: str = None):
         self.bandit = bandit
         
         # Set up device for GPU acceleration
@@ -28,6 +36,10 @@ class RecommendationScorer:
         else:
             self.device = device
         print(f"RecommendationScorer using device: {self.device}")
+
+        # Proximity: haversine distance mapped through a decay curve
+        self.location_decay = getattr(Config, "LOCATION_DECAY", "linear")
+        self.location_scale_km = getattr(Config, "LOCATION_SCALE_KM", 50.0)
         
         # Initialize sentence transformer for semantic skill matching
         if SENTENCE_TRANSFORMERS_AVAILABLE:
@@ -41,24 +53,59 @@ class RecommendationScorer:
         else:
             self.skill_model = None
 
+        # Each distinct skill phrase is encoded once per process
+        self.skill_cache = None
+        if self.skill_model is not None:
+            self.skill_cache = SkillEmbeddingCache(
+                self.skill_model,
+                max_entries=getattr(Config, "SKILL_EMBEDDING_CACHE_SIZE", 10000),
+                device=self.device,
+                persist_path=skill_cache_path,
+            )
+            if skill_cache_path:
+                atexit.register(self.skill_cache.save)
+
+        # Synonym taxonomy for rule-based matching, compiled once
+        self.synonym_index = SkillSynonymIndex.from_file(
+            getattr(Config, "SKILL_SYNONYMS_PATH", None)
+        )
+
+        # Per resource type index of catalog required-skill embeddings;
+        # posted resource lists are scored with a scratch index instead
+        self.skill_indexes: Dict[str, ResourceSkillIndex] = {}
+
     def calculate_location_score(
         self, individual_location: tuple, resource_location: tuple
     ) -> float:
         """
         Calculate proximity score (closer is better).
-        GPU-accelerated for batch operations.
         """
         if not individual_location or not resource_location:
             return 0.5
 
-        # Use GPU for distance calculation
-        ind_loc = torch.tensor(individual_location, device=self.device, dtype=torch.float32)
-        res_loc = torch.tensor(resource_location, device=self.device, dtype=torch.float32)
-        
-        distance = torch.dist(ind_loc, res_loc).item()
-        # Normalize: assume max relevant distance is 50 units (e.g., km)
-        normalized_distance = min(distance / 50.0, 1.0)
-        return 1.0 - normalized_distance
+        distance = haversine_km(
+            individual_location[0],
+            individual_location[1],
+            resource_location[0],
+            resource_location[1],
+        )
+        return float(distance_decay(distance, self.location_decay, self.location_scale_km))
+
+    def calculate_location_matrix(
+        self, individuals: List[Dict], resources: List[Dict]
+    ) -> np.ndarray:
+        """
+        (individuals x resources) proximity scores from one vectorized
+        haversine pass. Missing locations score a neutral 0.5.
+        """
+        ind_lats, ind_lons, ind_valid = location_arrays(individuals)
+        res_lats, res_lons, res_valid = location_arrays(resources)
+
+        distances = haversine_km(
+            ind_lats[:, None], ind_lons[:, None], res_lats[None, :], res_lons[None, :]
+        )
+        scores = distance_decay(distances, self.location_decay, self.location_scale_km)
+        return np.where(ind_valid[:, None] & res_valid[None, :], scores, 0.5)
 
     def calculate_skill_match_score(
         self, individual_skills: List[str], required_skills: List[str]
@@ -79,26 +126,97 @@ class RecommendationScorer:
         # Fallback to rule-based matching
         return self._fallback_skill_match(individual_skills, required_skills)
     
+    def calculate_skill_match_matrix(
+        self,
+        individuals_skills: List[List[str]],
+        resources: List[Dict],
+        resource_type: str,
+        sync: bool = True,
+        skill_index: ResourceSkillIndex = None,
+    ) -> np.ndarray:
+        """
+        (individuals x resources) skill alignment scores.
+        With the semantic model this is one matmul over a skill index:
+        skill_index when given, otherwise a scratch index of the posted
+        resources (sync=True) or the catalog index (sync=False).
+        """
+        if self.skill_cache is not None:
+            try:
+                index = skill_index
+                if index is None:
+                    if sync:
+                        index = self.build_skill_index(resources)
+                    else:
+                        index = self.get_skill_index(resource_type)
+                return index.score_matrix(
+                    individuals_skills, [r["id"] for r in resources]
+                )
+            except Exception as e:
+                print(f"⚠️  Indexed skill matching failed: {e}, scoring per resource")
+
+        return np.array(
+            [
+                [
+                    self.calculate_skill_match_score(
+                        skills, r.get("required_skills", [])
+                    )
+                    for r in resources
+                ]
+                for skills in individuals_skills
+            ],
+            dtype=np.float64,
+        ).reshape(len(individuals_skills), len(resources))
+
+    def get_skill_index(self, resource_type: str) -> ResourceSkillIndex:
+        """Get (or create) the catalog skill index for a resource type."""
+        index = self.skill_indexes.get(resource_type)
+        if index is None:
+            index = self.skill_indexes.setdefault(
+                resource_type, ResourceSkillIndex(self.skill_cache, self.device)
+            )
+        return index
+
+    def build_skill_index(self, resources: List[Dict]) -> ResourceSkillIndex:
+        """
+        Scratch skill index over a posted resource list, kept apart from the
+        catalog index so ad-hoc ids can neither overwrite catalog entries
+        nor accumulate in it. None without the semantic model.
+        """
+        if self.skill_cache is None:
+            return None
+        index = ResourceSkillIndex(self.skill_cache, self.device)
+        index.sync(resources)
+        return index
+
+    def index_resources(self, resource_type: str, resources: List[Dict]):
+        """Add or refresh catalog resources in the skill index."""
+        if self.skill_cache is not None:
+            self.get_skill_index(resource_type).sync(resources)
+
+    def remove_resource(self, resource_type: str, resource_id: str):
+        """Forget a resource that was closed or deleted."""
+        index = self.skill_indexes.get(resource_type)
+        if index is not None:
+            index.remove(resource_id)
+
     def _semantic_skill_match(self, individual_skills: List[str], required_skills: List[str]) -> float:
         """
         Use sentence transformers for semantic skill matching.
+        Embeddings come from the cache and are normalized, so the cosine
+        similarity matrix is a single matrix multiply.
         """
         try:
-            # Encode skills
-            ind_embeddings = self.skill_model.encode(individual_skills, convert_to_tensor=True)
-            req_embeddings = self.skill_model.encode(required_skills, convert_to_tensor=True)
-            
-            # Calculate cosine similarity matrix
-            similarities = util.cos_sim(ind_embeddings, req_embeddings)
-            
+            ind_embeddings = self.skill_cache.encode(individual_skills)
+            req_embeddings = self.skill_cache.encode(required_skills)
+
+            # Cosine similarity matrix: required skills x individual skills
+            similarities = req_embeddings @ ind_embeddings.T
+
             # For each required skill, find the best matching individual skill
-            matches = 0.0
-            for req_idx in range(len(required_skills)):
-                best_match = torch.max(similarities[:, req_idx]).item()
-                # Consider it a match if similarity > 0.5 (50%)
-                if best_match > 0.5:
-                    matches += best_match
-            
+            best_matches = similarities.max(dim=1).values
+            # Consider it a match if similarity > 0.5 (50%)
+            matches = best_matches[best_matches > 0.5].sum().item()
+
             return min(matches / len(required_skills), 1.0)
         except Exception as e:
             print(f"⚠️  Semantic matching failed: {e}, falling back")
@@ -108,59 +226,7 @@ class RecommendationScorer:
         """
         Fallback rule-based skill matching with synonyms.
         """
-
-        # Skill synonyms and related terms
-        skill_synonyms = {
-            'drive': ['driving', 'driver', 'can drive', 'valid license', 'license', 'navigation', 'delivery'],
-            'construction': ['carpentry', 'building', 'physical labor', 'laborer', 'builder'],
-            'cook': ['cooking', 'food service', 'kitchen', 'culinary', 'chef'],
-            'clean': ['cleaning', 'housekeeping', 'janitorial', 'maintenance', 'janitor'],
-            'customer service': ['retail', 'sales', 'cashier', 'service', 'customer'],
-            'organize': ['organization', 'organizing', 'stocking', 'inventory'],
-            'computer': ['typing', 'data entry', 'office', 'microsoft', 'tech'],
-            'warehouse': ['loading', 'unloading', 'forklift', 'physical labor'],
-            'language': ['languages', 'multilingual', 'bilingual', 'translation'],
-        }
-
-        individual_set = set(s.lower().strip() for s in individual_skills)
-        required_set = set(s.lower().strip() for s in required_skills)
-
-        matches = 0
-        
-        # Check for exact matches first
-        exact_matches = individual_set.intersection(required_set)
-        matches += len(exact_matches)
-        
-        # Check for fuzzy/synonym matches
-        for ind_skill in individual_set:
-            if ind_skill in exact_matches:
-                continue  # Already counted
-                
-            for req_skill in required_set:
-                if req_skill in exact_matches:
-                    continue  # Already counted
-                
-                # Check if skills contain each other (partial match)
-                if ind_skill in req_skill or req_skill in ind_skill:
-                    matches += 0.8  # Partial match worth 80%
-                    continue
-                
-                # Check synonyms - also check if any word in the skill matches
-                for base_skill, synonyms in skill_synonyms.items():
-                    ind_words = ind_skill.split()
-                    req_words = req_skill.split()
-                    
-                    # Check if the skill or any word in it matches the synonym group
-                    ind_match = (ind_skill in synonyms or ind_skill == base_skill or 
-                                any(word in synonyms or word == base_skill for word in ind_words))
-                    req_match = (req_skill in synonyms or req_skill == base_skill or
-                                any(word in synonyms or word == base_skill for word in req_words))
-                    
-                    if ind_match and req_match:
-                        matches += 0.7  # Synonym match worth 70%
-                        break
-
-        return min(matches / len(required_set), 1.0)
+        return self.synonym_index.match_score(individual_skills, required_skills)
 
     def calculate_availability_score(
         self, resource_capacity: int, resource_occupied: int
@@ -217,10 +283,15 @@ class RecommendationScorer:
         return 0.5
 
     def calculate_composite_score(
-        self, individual: Dict, resource: Dict, resource_type: str
+        self,
+        individual: Dict,
+        resource: Dict,
+        resource_type: str,
+        explain: bool = True,
     ) -> tuple[float, Dict]:
         """
         Calculate weighted composite score with explanation.
+        With explain=False the explanation is None.
         """
         # Location score
         location_score = self.calculate_location_score(
@@ -260,11 +331,14 @@ class RecommendationScorer:
         # Cold start bonus
         if (
             self.bandit
-            and self.bandit.counts[resource_type][resource["id"]]
+            and self.bandit.get_count(resource_type, resource["id"])
             < Config.MIN_INTERACTIONS_FOR_LEARNING
         ):
             composite += Config.COLD_START_BONUS
 
+        if not explain:
+            return composite, None
+
         explanation = {
             "location_score": round(location_score, 3),
             "skill_match_score": round(skill_score, 3),
@@ -275,3 +349,128 @@ class RecommendationScorer:
         }
 
         return composite, explanation
+
+    def score_candidates(
+        self,
+        individual: Dict,
+        resources: List[Dict],
+        resource_type: str,
+        sync: bool = True,
+        bandit=None,
+        skill_index: ResourceSkillIndex = None,
+    ) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Score one individual against many resources at once.
+        Returns composite scores and the per-component score arrays; build
+        explanations for the items you keep with `build_explanation`.
+        """
+        composite, components = self.score_matrix(
+            [individual],
+            resources,
+            resource_type,
+            sync=sync,
+            bandit=bandit,
+            skill_index=skill_index,
+        )
+        return composite[0], self.component_row(components, 0)
+
+    def score_matrix(
+        self,
+        individuals: List[Dict],
+        resources: List[Dict],
+        resource_type: str,
+        sync: bool = True,
+        bandit=None,
+        skill_index: ResourceSkillIndex = None,
+    ) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Score many individuals against many resources.
+        Returns an (individuals x resources) composite matrix and the
+        component scores; components that do not depend on the individual
+        (availability, historical) are per-resource vectors.
+        bandit overrides the scorer's bandit for the historical component
+        (e.g. an A/B variant's own bandit). sync=True scores skills against
+        a scratch index of `resources`, sync=False against the catalog
+        index; pass skill_index to reuse one across calls.
+        """
+        if bandit is None:
+            bandit = self.bandit
+
+        location_scores = self.calculate_location_matrix(individuals, resources)
+        skill_scores = self.calculate_skill_match_matrix(
+            [ind.get("skills", []) for ind in individuals],
+            resources,
+            resource_type,
+            sync=sync,
+            skill_index=skill_index,
+        )
+
+        # Per-resource terms, plus priority scores for every priority level
+        availability_scores = np.empty(len(resources))
+        priority_table = np.empty((len(PRIORITY_LEVELS), len(resources)))
+
+        for idx, resource in enumerate(resources):
+            availability_scores[idx] = self.calculate_availability_score(
+                resource.get("capacity", 0), resource.get("occupied", 0)
+            )
+            priority_support = resource.get("priority_support", ["low", "medium", "high"])
+            for level_idx, level in enumerate(PRIORITY_LEVELS):
+                priority_table[level_idx, idx] = self.calculate_priority_score(
+                    level, priority_support
+                )
+
+        # Historical success and cold-start flags in one bandit lookup
+        if bandit:
+            historical_scores, counts = bandit.get_arm_summary(
+                resource_type, [r["id"] for r in resources]
+            )
+            cold_start = counts < Config.MIN_INTERACTIONS_FOR_LEARNING
+        else:
+            historical_scores = np.full(len(resources), 0.5)
+            cold_start = np.zeros(len(resources), dtype=bool)
+
+        # Unknown priorities are treated as medium
+        level_rows = [
+            PRIORITY_ROWS.get(str(ind.get("priority", "medium")).lower(), 1)
+            for ind in individuals
+        ]
+        priority_scores = priority_table[level_rows]
+
+        composite = (
+            Config.WEIGHT_LOCATION * location_scores
+            + Config.WEIGHT_SKILL_MATCH * skill_scores
+            + Config.WEIGHT_AVAILABILITY * availability_scores
+            + Config.WEIGHT_PRIORITY * priority_scores
+            + Config.WEIGHT_HISTORICAL * historical_scores
+            + Config.COLD_START_BONUS * cold_start
+        )
+
+        components = {
+            "location_score": location_scores,
+            "skill_match_score": skill_scores,
+            "availability_score": availability_scores,
+            "priority_score": priority_scores,
+            "historical_score": historical_scores,
+        }
+        return composite, components
+
+    @staticmethod
+    def component_row(components: Dict[str, np.ndarray], row: int) -> Dict[str, np.ndarray]:
+        """Per-resource component arrays for one individual of a `score_matrix` result."""
+        return {
+            name: scores[row] if scores.ndim == 2 else scores
+            for name, scores in components.items()
+        }
+
+    @staticmethod
+    def build_explanation(
+        composite: np.ndarray, components: Dict[str, np.ndarray], idx: int
+    ) -> Dict:
+        """
+        Explanation dict for candidate `idx` of a `score_candidates` result.
+        """
+        explanation = {
+            name: round(float(scores[idx]), 3) for name, scores in components.items()
+        }
+        explanation["composite_score"] = round(float(composite[idx]), 3)
+        return explanation
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+
+
+class SkillEmbeddingCache:
+    """
+    Bounded, thread-safe cache of skill-phrase embeddings.
+    Each distinct (normalized) skill phrase is encoded once per process;
+    rows are L2-normalized so cosine similarity is a plain matrix multiply.
+    Optionally persisted to disk as a memory-mapped float16 matrix.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_entries: int = 10000,
+        device=None,
+        persist_path: Optional[str] = None,
+    ):
+        self.model = model
+        self.max_entries = max_entries
+        self.device = device if device is not None else torch.device("cpu")
+        self.persist_path = persist_path
+
+        self._entries: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Read-only rows loaded from disk, looked up lazily
+        self._disk_rows: Dict[str, int] = {}
+        self._disk_matrix = None
+
+        self.hits = 0
+        self.misses = 0
+
+        if persist_path:
+            self.load(persist_path)
+
+    @staticmethod
+    def normalize(skill: str) -> str:
+        """Normalize a skill phrase to its cache key."""
+        return " ".join(str(skill).lower().split())
+
+    def encode(self, skills: List[str]) -> torch.Tensor:
+        """
+        Return a (len(skills), dim) float32 tensor of normalized embeddings.
+        Only phrases not seen before are sent to the model, in one batch.
+        """
+        keys = [self.normalize(s) for s in skills]
+        found: Dict[str, torch.Tensor] = {}
+        missing: List[str] = []
+
+        with self._lock:
+            for key in keys:
+                if key in found or key in missing:
+                    continue
+                embedding = self._lookup(key)
+                if embedding is None:
+                    missing.append(key)
+                    self.misses += 1
+                else:
+                    found[key] = embedding
+                    self.hits += 1
+
+        if missing:
+            # Encode outside the lock so concurrent lookups are not blocked
+            encoded = self.model.encode(
+                missing, convert_to_tensor=True, normalize_embeddings=True
+            ).to(self.device, dtype=torch.float32)
+
+            with self._lock:
+                for key, embedding in zip(missing, encoded):
+                    found[key] = embedding
+                    self._insert(key, embedding)
+
+        return torch.stack([found[key] for key in keys])
+
+    def _lookup(self, key: str) -> Optional[torch.Tensor]:
+        """Find a cached embedding (caller holds the lock)."""
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+            return embedding
+
+        row = self._disk_rows.get(key)
+        if row is not None:
+            embedding = torch.from_numpy(
+                np.asarray(self._disk_matrix[row], dtype=np.float32)
+            ).to(self.device)
+            self._insert(key, embedding)
+            return embedding
+
+        return None
+
+    def _insert(self, key: str, embedding: torch.Tensor):
+        """Insert an embedding, evicting least recently used (caller holds the lock)."""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self, path: Optional[str] = None):
+        """
+        Persist up to max_entries embeddings as `<path>.npy` (float16) plus
+        a `<path>.vocab.json` key list, oldest first. Live entries win over
+        rows only known from the previous file, which count as older than
+        any of them. Files are replaced atomically.
+        """
+        path = path or self.persist_path
+        if not path:
+            return
+
+        with self._lock:
+            # Rows only on disk, newest last, in the room the live entries leave
+            disk_only = [key for key in self._disk_rows if key not in self._entries]
+            room = max(0, self.max_entries - len(self._entries))
+            disk_only = disk_only[max(0, len(disk_only) - room) :] if room else []
+
+            keys = disk_only[:]
+            rows = [
+                np.asarray(self._disk_matrix[self._disk_rows[k]], dtype=np.float32)
+                for k in disk_only
+            ]
+            live = list(self._entries.keys())[-self.max_entries :]
+            keys.extend(live)
+            rows.extend(self._entries[k].float().cpu().numpy() for k in live)
+
+        if not rows:
+            return
+
+        matrix = np.stack(rows).astype(np.float16)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        tmp_matrix = f"{path}.npy.tmp"
+        tmp_vocab = f"{path}.vocab.json.tmp"
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, matrix)
+        with open(tmp_vocab, "w") as f:
+            json.dump(keys, f)
+        os.replace(tmp_matrix, f"{path}.npy")
+        os.replace(tmp_vocab, f"{path}.vocab.json")
+
+    def load(self, path: str):
+        """Memory-map embeddings previously written by `save`."""
+        matrix_path = f"{path}.npy"
+        vocab_path = f"{path}.vocab.json"
+        if not (os.path.exists(matrix_path) and os.path.exists(vocab_path)):
+            return
+
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            with open(vocab_path) as f:
+                keys = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Failed to load skill embedding cache: {e}")
+            return
+
+        if len(keys) != matrix.shape[0]:
+            print("⚠️  Skill embedding cache is inconsistent, ignoring it")
+            return
+
+        with self._lock:
+            self._disk_matrix = matrix
+            self._disk_rows = {key: row for row, key in enumerate(keys)}
+        print(f"✅ Loaded {len(keys)} cached skill embeddings from {matrix_path}")
+
+    def stats(self) -> Dict:
+        """Cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "disk_entries": len(self._disk_rows),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,285 @@
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+import torch
+
+from models.skill_embeddings import SkillEmbeddingCache
+
+
+class ResourceSkillIndex:
+    """
+    Required-skill embeddings for a set of resources, stored in one
+    contiguous matrix. Resource i owns rows offsets[i]:offsets[i] + lengths[i],
+    so skill scores against every resource are one matmul followed by a
+    segmented max/sum. Resources can be added, changed or removed
+    incrementally; removed rows are compacted away lazily.
+
+    Indexed rows are never rewritten in place (compaction builds a new
+    matrix), so scoring snapshots them under the lock and runs the matmul
+    outside it. When the requested resources own a small share of the
+    rows (e.g. after pre-filtering), only their rows are gathered and
+    multiplied.
+    """
+
+    MATCH_THRESHOLD = 0.5
+
+    def __init__(self, skill_cache: SkillEmbeddingCache, device=None):
+        self.skill_cache = skill_cache
+        self.device = device if device is not None else torch.device("cpu")
+        self._lock = threading.RLock()
+
+        self._matrix = None  # (row_capacity, dim) on device
+        self._row_owner = np.zeros(0, dtype=np.int64)  # slot per row, -1 if dead
+        self._used_rows = 0
+        self._dead_rows = 0
+
+        self._slots: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._slot_skills: List[Tuple[str, ...]] = []
+        self._offsets = np.zeros(0, dtype=np.int64)
+        self._lengths = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, resource_id: str) -> bool:
+        return resource_id in self._slots
+
+    def upsert(self, resource_id: str, required_skills: List[str]):
+        """Add a resource or replace its required skills."""
+        skills = self._normalize(required_skills)
+
+        with self._lock:
+            if self._unchanged(resource_id, skills):
+                return
+
+            embeddings = self.skill_cache.encode(list(skills)) if skills else None
+            self._set_rows(resource_id, skills, embeddings)
+            self._maybe_compact()
+
+    def sync(self, resources: List[Dict]):
+        """
+        Upsert every resource; unchanged ones are a cheap no-op. Skills of
+        the changed ones are encoded in a single batch.
+        """
+        changed: Dict[str, Tuple[str, ...]] = {}
+        with self._lock:
+            for resource in resources:
+                skills = self._normalize(resource.get("required_skills", []))
+                if not self._unchanged(resource["id"], skills):
+                    changed[resource["id"]] = skills
+        if not changed:
+            return
+
+        flat_skills = [skill for skills in changed.values() for skill in skills]
+        embeddings = self.skill_cache.encode(flat_skills) if flat_skills else None
+
+        with self._lock:
+            # Lay the changed resources out back to back, then append once
+            owners = np.empty(len(flat_skills), dtype=np.int64)
+            row = 0
+            for resource_id, skills in changed.items():
+                slot = self._assign_rows(resource_id, skills, self._used_rows + row)
+                owners[row : row + len(skills)] = slot
+                row += len(skills)
+            if flat_skills:
+                self._append_rows(embeddings, owners)
+            self._maybe_compact()
+
+    def remove(self, resource_id: str):
+        """Drop a resource (e.g. a job that was filled or closed)."""
+        with self._lock:
+            slot = self._slots.pop(resource_id, None)
+            if slot is None:
+                return
+            self._release_rows(slot)
+            self._slot_skills[slot] = ()
+            self._lengths[slot] = 0
+            self._free_slots.append(slot)
+            self._maybe_compact()
+
+    def scores(self, individual_skills: List[str], resource_ids: List[str]) -> np.ndarray:
+        """
+        Skill match score of one individual against the given resources.
+        Every id must already be indexed (see `sync`).
+        """
+        return self.score_matrix([individual_skills], resource_ids)[0]
+
+    def score_matrix(
+        self, individuals_skills: List[List[str]], resource_ids: List[str]
+    ) -> np.ndarray:
+        """
+        (individuals x resources) skill match scores. All individuals'
+        skills go through one matmul; a segmented max picks each
+        individual's best skill per required skill and a segmented sum
+        folds required skills into resources.
+        """
+        n_individuals = len(individuals_skills)
+        skill_counts = np.array([len(skills or []) for skills in individuals_skills])
+        flat_skills = [skill for skills in individuals_skills for skill in skills or []]
+
+        # Snapshot the index; the heavy work below runs without the lock
+        with self._lock:
+            slots = np.fromiter(
+                (self._slots[rid] for rid in resource_ids),
+                dtype=np.int64,
+                count=len(resource_ids),
+            )
+            lengths = self._lengths[slots]
+            offsets = self._offsets[slots]
+            used_rows = self._used_rows
+            matrix = self._matrix[:used_rows] if used_rows else None
+            n_rows = int(lengths.sum())
+            gather = 2 * n_rows < used_rows
+            owners = None if gather else self._row_owner[:used_rows].copy()
+            n_slots = len(self._slot_skills)
+
+        # No required skills -> 1.0, otherwise nothing can match yet
+        empty = np.broadcast_to(
+            np.where(lengths == 0, 1.0, 0.0), (n_individuals, len(resource_ids))
+        )
+        if not flat_skills or n_rows == 0:
+            return empty.copy()
+
+        if gather:
+            # Only the requested resources' rows, grouped by request position
+            groups = np.repeat(np.arange(len(slots)), lengths)
+            first_row = np.cumsum(lengths) - lengths
+            row_ids = np.repeat(offsets, lengths) + np.arange(n_rows) - first_row[groups]
+            rows = matrix[torch.from_numpy(row_ids).to(self.device)]
+            n_groups = len(slots)
+        else:
+            # Every indexed row, grouped by slot; dead rows get a spare group
+            groups = owners
+            groups[groups < 0] = n_slots
+            rows = matrix
+            n_groups = n_slots
+
+        ind_embeddings = self.skill_cache.encode(flat_skills)
+        segments = torch.from_numpy(
+            np.repeat(np.arange(n_individuals), skill_counts)
+        ).to(self.device)
+
+        # Similarity of every required skill row to every individual skill
+        similarities = rows @ ind_embeddings.T
+
+        # Best skill of each individual per required skill
+        best = torch.full(
+            (rows.shape[0], n_individuals),
+            -1.0,
+            device=self.device,
+            dtype=similarities.dtype,
+        )
+        best.scatter_reduce_(
+            1, segments.expand(rows.shape[0], -1), similarities, reduce="amax"
+        )
+        best = torch.where(best > self.MATCH_THRESHOLD, best, torch.zeros_like(best))
+
+        # Segmented sum per group
+        sums = torch.zeros(
+            n_groups + 1, n_individuals, device=self.device, dtype=best.dtype
+        )
+        sums.index_add_(0, torch.from_numpy(groups).to(self.device), best)
+        sums = sums[:n_groups].cpu().numpy()
+
+        matched = (sums if gather else sums[slots]).T
+        scores = np.where(
+            lengths == 0, 1.0, np.minimum(matched / np.maximum(lengths, 1), 1.0)
+        )
+        return np.where((skill_counts > 0)[:, None], scores, empty)
+
+    @staticmethod
+    def _normalize(required_skills: List[str]) -> Tuple[str, ...]:
+        return tuple(SkillEmbeddingCache.normalize(s) for s in required_skills or [])
+
+    def _unchanged(self, resource_id: str, skills: Tuple[str, ...]) -> bool:
+        slot = self._slots.get(resource_id)
+        return slot is not None and self._slot_skills[slot] == skills
+
+    def _set_rows(self, resource_id: str, skills: Tuple[str, ...], embeddings):
+        """Point a resource at freshly appended rows (caller holds the lock)."""
+        slot = self._assign_rows(resource_id, skills, self._used_rows)
+        if skills:
+            self._append_rows(embeddings, slot)
+
+    def _assign_rows(self, resource_id: str, skills: Tuple[str, ...], offset: int) -> int:
+        """Give a resource the rows starting at offset; returns its slot."""
+        slot = self._slots.get(resource_id)
+        if slot is None:
+            slot = self._allocate_slot()
+            self._slots[resource_id] = slot
+        else:
+            self._release_rows(slot)
+
+        self._slot_skills[slot] = skills
+        self._offsets[slot] = offset
+        self._lengths[slot] = len(skills)
+        return slot
+
+    def _allocate_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+
+        slot = len(self._slot_skills)
+        self._slot_skills.append(())
+        if slot >= len(self._offsets):
+            capacity = max(16, 2 * len(self._offsets))
+            self._offsets = np.resize(self._offsets, capacity)
+            self._lengths = np.resize(self._lengths, capacity)
+        self._offsets[slot] = 0
+        self._lengths[slot] = 0
+        return slot
+
+    def _release_rows(self, slot: int):
+        start, length = self._offsets[slot], self._lengths[slot]
+        if length:
+            self._row_owner[start : start + length] = -1
+            self._dead_rows += int(length)
+
+    def _append_rows(self, embeddings: torch.Tensor, owners):
+        """Append rows owned by one slot, or by a per-row array of slots."""
+        n_rows, dim = embeddings.shape
+        needed = self._used_rows + n_rows
+
+        if self._matrix is None or needed > self._matrix.shape[0]:
+            capacity = max(64, needed, 2 * (0 if self._matrix is None else self._matrix.shape[0]))
+            matrix = torch.zeros(capacity, dim, device=self.device, dtype=torch.float32)
+            row_owner = np.full(capacity, -1, dtype=np.int64)
+            if self._matrix is not None:
+                matrix[: self._used_rows] = self._matrix[: self._used_rows]
+                row_owner[: self._used_rows] = self._row_owner[: self._used_rows]
+            self._matrix, self._row_owner = matrix, row_owner
+
+        self._matrix[self._used_rows : needed] = embeddings
+        self._row_owner[self._used_rows : needed] = owners
+        self._used_rows = needed
+
+    def _maybe_compact(self):
+        """Compact once dead rows (removed or re-upserted) outnumber live ones."""
+        if self._dead_rows > max(64, self._used_rows // 2):
+            self._compact()
+
+    def _compact(self):
+        """
+        Copy live rows into a new matrix. The old one is left untouched for
+        scorers still reading a snapshot of it.
+        """
+        live = np.flatnonzero(self._row_owner[: self._used_rows] >= 0)
+        owners = self._row_owner[live]
+
+        capacity = max(64, 2 * len(live))
+        matrix = torch.zeros(
+            capacity, self._matrix.shape[1], device=self.device, dtype=torch.float32
+        )
+        matrix[: len(live)] = self._matrix[torch.from_numpy(live).to(self.device)]
+        row_owner = np.full(capacity, -1, dtype=np.int64)
+        row_owner[: len(live)] = owners
+
+        self._matrix, self._row_owner = matrix, row_owner
+        self._used_rows = len(live)
+        self._dead_rows = 0
+
+        # Rows of a slot stay contiguous, so the new offset is its first row
+        slots, first_rows = np.unique(owners, return_index=True)
+        self._offsets[slots] = first_rows
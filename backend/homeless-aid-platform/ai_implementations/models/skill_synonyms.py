@@ -0,0 +1,69 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List
+
+DEFAULT_SYNONYMS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "skill_synonyms.json"
+)
+
+
+class SkillSynonymIndex:
+    """
+    Precompiled skill synonym taxonomy.
+    Every phrase maps to a bitset of synonym-group ids, so two skills are
+    synonyms when their canonical bitsets intersect.
+    """
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.group_names = list(groups.keys())
+        self._phrase_groups: Dict[str, int] = {}
+
+        for group_id, (base_skill, synonyms) in enumerate(groups.items()):
+            bit = 1 << group_id
+            for phrase in [base_skill, *synonyms]:
+                key = phrase.lower().strip()
+                self._phrase_groups[key] = self._phrase_groups.get(key, 0) | bit
+
+        # Skill vocabularies are small, so memoize canonicalization
+        self.canonicalize = lru_cache(maxsize=8192)(self._canonicalize)
+
+    @classmethod
+    def from_file(cls, path: str = None) -> "SkillSynonymIndex":
+        """Load a {base_skill: [synonyms]} taxonomy from a JSON file."""
+        with open(path or DEFAULT_SYNONYMS_PATH) as f:
+            return cls(json.load(f))
+
+    def _canonicalize(self, skill: str) -> int:
+        """
+        Bitset of groups a normalized skill belongs to: the whole phrase or
+        any single word of it may name a group member.
+        """
+        groups = self._phrase_groups.get(skill, 0)
+        for word in skill.split():
+            groups |= self._phrase_groups.get(word, 0)
+        return groups
+
+    def match_score(self, individual_skills: List[str], required_skills: List[str]) -> float:
+        """
+        Rule-based skill match: exact matches count 1.0, partial (substring)
+        matches 0.8 and synonym-group matches 0.7 per pair.
+        """
+        individual_set = set(s.lower().strip() for s in individual_skills)
+        required_set = set(s.lower().strip() for s in required_skills)
+
+        exact_matches = individual_set & required_set
+        matches = float(len(exact_matches))
+
+        required_rest = [
+            (skill, self.canonicalize(skill)) for skill in required_set - exact_matches
+        ]
+        for ind_skill in individual_set - exact_matches:
+            ind_groups = self.canonicalize(ind_skill)
+            for req_skill, req_groups in required_rest:
+                if ind_skill in req_skill or req_skill in ind_skill:
+                    matches += 0.8  # Partial match worth 80%
+                elif ind_groups & req_groups:
+                    matches += 0.7  # Synonym match worth 70%
+
+        return min(matches / len(required_set), 1.0)
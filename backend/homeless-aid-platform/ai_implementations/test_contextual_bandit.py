@@ -0,0 +1,33 @@
+import numpy as np
+
+from models.contextual_bandit import CONTEXT_COMPONENTS, CONTEXT_DIM, LinUCBPolicy, build_contexts
+
+
+def _components(n):
+    return {name: np.linspace(0.1, 0.9, n) for name in CONTEXT_COMPONENTS}
+
+
+def test_null_and_malformed_fields_use_defaults():
+    indices = np.arange(3)
+    defaults = build_contexts({}, _components(3), indices)
+
+    for individual in (
+        {"age": None, "skills": None, "work_experience_years": None},
+        {"age": "unknown", "skills": "cooking", "work_experience_years": [2]},
+        {"age": float("nan"), "education": ["GED"], "health_conditions": [None]},
+    ):
+        contexts = build_contexts(individual, _components(3), indices)
+        assert contexts.shape == (3, CONTEXT_DIM)
+        np.testing.assert_array_equal(contexts, defaults)
+
+
+def test_numeric_strings_are_parsed():
+    contexts = build_contexts({"age": "35"}, _components(1), np.arange(1))
+    assert contexts[0, 1] == 0.35
+
+
+def test_linucb_selects_with_null_age():
+    policy = LinUCBPolicy()
+    contexts = build_contexts({"age": None}, _components(2), np.arange(2))
+    chosen = policy.select_action("job", ["j1", "j2"], contexts, np.array([0.9, 0.1]))
+    assert chosen in ("j1", "j2")
@@ -0,0 +1,52 @@
+import pytest
+
+from models.risk_predictor import RiskPredictor
+
+PROFILE = {
+    "age": 45,
+    "skills": ["cooking", "cleaning"],
+    "education": "High School/GED",
+    "work_experience_years": 4,
+    "duration_homeless": "1-2 years",
+    "previous_shelter_stays": [1, 2],
+    "urgent_needs": ["Medical Care"],
+    "has_id": True,
+}
+
+
+@pytest.fixture(scope="module")
+def predictor():
+    return RiskPredictor()
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("age", None),
+        ("age", "unknown"),
+        ("skills", None),
+        ("work_experience_years", "n/a"),
+        ("duration_homeless", None),
+        ("previous_shelter_stays", 3),
+        ("urgent_needs", None),
+        ("health_conditions", 5),
+    ],
+)
+def test_malformed_field_is_treated_as_missing(predictor, field, value):
+    missing = {k: v for k, v in PROFILE.items() if k != field}
+    malformed = {**PROFILE, field: value}
+
+    expected = predictor.comprehensive_risk_assessment(missing)
+    assert predictor.comprehensive_risk_assessment(malformed) == expected
+    assert predictor.assess_many([malformed]) == [expected]
+
+
+def test_numeric_strings_are_parsed(predictor):
+    assert predictor.assess_many([{**PROFILE, "age": "45"}]) == predictor.assess_many(
+        [PROFILE]
+    )
+
+
+def test_assess_many_rejects_non_object_profiles(predictor):
+    with pytest.raises(ValueError, match="Profile 1"):
+        predictor.assess_many([PROFILE, None])